@@ -0,0 +1,357 @@
+"""
+Load test for the tenant webhook ingress (`/webhook/{uid}`).
+
+Boots the real `create_app()` against:
+- SQLite in memory (or `--db-dsn`, e.g. a local Postgres),
+- a stub Vault (KV v2 over HTTP, served by this script),
+- a fake Telegram Bot API that records every method call,
+then fires synthetic `/start` and button callback updates across many tenant
+UIDs and reports throughput, latency percentiles, DB queries per update and
+Bot API calls.
+
+    python bench/webhook_load.py --tenants 200 --updates 20000 --concurrency 100
+    python bench/webhook_load.py --inline   # latency of full update processing
+
+By default updates are handled in background (as in production), so latency
+is webhook ingress only and throughput counts fully processed updates.
+Everything runs in one event loop: compare numbers between commits on the same
+machine rather than reading them as absolute capacity.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from aiohttp import ClientSession, TCPConnector, web
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+WEBHOOK_SECRET = "bench-secret"
+MAIN_BOT_TOKEN = "100000:bench-main"
+SUBSCRIPTION_CHANNEL = "@bench_channel"
+
+
+# --- fake Telegram Bot API ----------------------------------------------------
+
+
+class FakeBotAPI:
+    """Answers any Bot API method with a plausible result and counts calls."""
+
+    def __init__(self) -> None:
+        self.calls: Counter[str] = Counter()
+        self._message_id = 0
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/bot{token}/{method}", self.handle)
+        return app
+
+    async def handle(self, request: web.Request) -> web.Response:
+        method = request.match_info["method"]
+        self.calls[method] += 1
+        params = await request.post()
+        token = request.match_info["token"]
+        return web.json_response({"ok": True, "result": self._result(method, token, params)})
+
+    def _result(self, method: str, token: str, params: Any) -> Any:
+        name = method.lower()
+        if name == "getme":
+            bot_id = int(token.split(":", 1)[0])
+            return {"id": bot_id, "is_bot": True, "first_name": "bench", "username": f"bench_{bot_id}_bot"}
+        if name == "getchatmember":
+            user_id = int(params.get("user_id", 1))
+            return {"status": "member", "user": {"id": user_id, "is_bot": False, "first_name": "u"}}
+        if name == "copymessage":
+            self._message_id += 1
+            return {"message_id": self._message_id}
+        if name.startswith(("send", "edit")):
+            self._message_id += 1
+            chat_id = int(params.get("chat_id", 1))
+            return {
+                "message_id": self._message_id,
+                "date": int(time.time()),
+                "chat": {"id": chat_id, "type": "private"},
+                "text": params.get("text", ""),
+            }
+        return True
+
+
+# --- stub Vault (KV v2) -------------------------------------------------------
+
+
+class StubVault:
+    """In-memory KV v2 with the endpoints VaultClient uses."""
+
+    def __init__(self, mount: str = "kv") -> None:
+        self.mount = mount
+        self.secrets: Dict[str, Dict[str, Any]] = {}
+        self.versions: Dict[str, int] = {}
+        self.calls: Counter[str] = Counter()
+
+    def put(self, path: str, data: Dict[str, Any]) -> None:
+        self.secrets[path] = data
+        self.versions[path] = self.versions.get(path, 0) + 1
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/v1/auth/token/lookup-self", self.lookup_self)
+        app.router.add_route("*", "/v1/{mount}/{kind}/{path:.+}", self.kv)
+        return app
+
+    async def lookup_self(self, _request: web.Request) -> web.Response:
+        return web.json_response({"data": {"ttl": 0, "renewable": False}})
+
+    async def kv(self, request: web.Request) -> web.Response:
+        kind, path = request.match_info["kind"], request.match_info["path"]
+        self.calls[f"{request.method} {kind}"] += 1
+        if request.method == "POST" and kind == "data":
+            self.put(path, (await request.json())["data"])
+            return web.json_response({"data": {"version": self.versions[path]}})
+        if request.method == "DELETE":
+            self.secrets.pop(path, None)
+            self.versions.pop(path, None)
+            return web.Response(status=204)
+        if path not in self.secrets:
+            return web.json_response({"errors": []}, status=404)
+        if kind == "metadata":
+            return web.json_response({"data": {"current_version": self.versions[path]}})
+        return web.json_response(
+            {"data": {"data": self.secrets[path], "metadata": {"version": self.versions[path]}}}
+        )
+
+
+# --- DB query counting --------------------------------------------------------
+
+
+class QueryCounter:
+    """Counts statements sent through the default Tortoise connection."""
+
+    METHODS = ("execute_query", "execute_query_dict", "execute_insert", "execute_many", "execute_script")
+
+    def __init__(self) -> None:
+        self.count = 0
+
+    def install(self) -> None:
+        from tortoise import Tortoise
+
+        cls = type(Tortoise.get_connection("default"))
+        for name in self.METHODS:
+            original = getattr(cls, name)
+
+            async def wrapper(conn, *args, __original=original, **kwargs):
+                self.count += 1
+                return await __original(conn, *args, **kwargs)
+
+            setattr(cls, name, wrapper)
+
+
+# --- synthetic updates --------------------------------------------------------
+
+
+def make_update(update_id: int, user_id: int, *, callback: Optional[str]) -> Dict[str, Any]:
+    user = {"id": user_id, "is_bot": False, "first_name": f"user{user_id}", "username": f"u{user_id}"}
+    chat = {"id": user_id, "type": "private"}
+    if callback is None:
+        return {
+            "update_id": update_id,
+            "message": {
+                "message_id": update_id,
+                "date": int(time.time()),
+                "chat": chat,
+                "from": user,
+                "text": "/start",
+                "entities": [{"type": "bot_command", "offset": 0, "length": 6}],
+            },
+        }
+    return {
+        "update_id": update_id,
+        "callback_query": {
+            "id": str(update_id),
+            "from": user,
+            "chat_instance": str(user_id),
+            "data": callback,
+            "message": {"message_id": 1, "date": int(time.time()), "chat": chat, "text": "menu"},
+        },
+    }
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(int(round(pct / 100 * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+# --- scenario -----------------------------------------------------------------
+
+
+async def start_site(app: web.Application) -> tuple[web.AppRunner, str]:
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]  # type: ignore[union-attr]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    fake_api, vault = FakeBotAPI(), StubVault()
+    api_runner, api_url = await start_site(fake_api.app())
+    vault_runner, vault_url = await start_site(vault.app())
+
+    vault.put("tgbot/common/webhook_secret", {"webhook_secret": WEBHOOK_SECRET})
+    vault.put("tgbot/common/db_dsn", {"db_dsn": args.db_dsn})
+    vault.put("tgbot/main_bot", {"bot_token": MAIN_BOT_TOKEN, "admin_ids": []})
+
+    os.environ.update(
+        {
+            "ENV": "dev",
+            "LOG_LEVEL": args.log_level,
+            "USE_REDIS": "false",
+            "EXTERNAL_BASE_URL": "http://127.0.0.1",
+            "VAULT_ADDR": vault_url,
+            "VAULT_TOKEN": "bench",
+            "TELEGRAM_API_URL": api_url,
+        }
+    )
+    # isolate from a local .env (AppSettings reads it from the cwd)
+    os.chdir(tempfile.mkdtemp(prefix="tgbot-bench-"))
+
+    from bot import create_app
+    from tgbot.database import start_db
+    from tgbot.database.managers import TenantManager
+    from tgbot.database.models import TenantSettings
+    from tgbot.services.locales import BUTTON_KEYS
+
+    # seed tenants before create_app() loads the registry and warms up
+    await start_db(args.db_dsn)
+    uids = [f"bench-{i:05d}" for i in range(args.tenants)]
+    for i, uid in enumerate(uids):
+        vault.put(f"tgbot/tenants/{uid}", {"bot_token": f"{200000 + i}:bench-{i}"})
+        tenant = await TenantManager(owner_id=1).create(uid=uid)
+        if tenant is not None and random.random() < args.subscription_share:
+            await TenantSettings.filter(tenant=tenant).update(
+                require_subscription=True, subscription_channel=SUBSCRIPTION_CHANNEL
+            )
+
+    webapp = await create_app()
+    handler = webapp["tenant_handler"]
+    if args.inline:
+        handler.handle_in_background = False
+    app_runner, app_url = await start_site(webapp)
+
+    counter = QueryCounter()
+    counter.install()
+
+    users = [random.randrange(1, 10**9) for _ in range(args.users)]
+    latencies: List[float] = []
+    statuses: Counter[int] = Counter()
+    update_ids = iter(range(1, args.updates + 1))
+    headers = {"X-Telegram-Bot-Api-Secret-Token": WEBHOOK_SECRET}
+
+    async def client(session: ClientSession) -> None:
+        for update_id in update_ids:
+            uid = random.choice(uids)
+            callback = random.choice(BUTTON_KEYS) if random.random() < args.callback_share else None
+            body = make_update(update_id, random.choice(users), callback=callback)
+            started = time.perf_counter()
+            async with session.post(f"{app_url}/webhook/{uid}", json=body, headers=headers) as resp:
+                await resp.read()
+            latencies.append(time.perf_counter() - started)
+            statuses[resp.status] += 1
+
+    # warm-up round: first-time locale/settings rows are not the steady state
+    async with ClientSession(connector=TCPConnector(limit=args.concurrency)) as session:
+        for i, uid in enumerate(uids):
+            body = make_update(args.updates + 1 + i, users[0], callback=None)
+            async with session.post(f"{app_url}/webhook/{uid}", json=body, headers=headers) as resp:
+                await resp.read()
+        while handler.supervisor.stats()["in_flight"] or handler.supervisor.stats()["queued"]:
+            await asyncio.sleep(0.01)
+
+        counter.count = 0
+        fake_api.calls.clear()
+        vault.calls.clear()
+        completed_before = handler.supervisor.stats()["completed"]
+        started = time.perf_counter()
+        await asyncio.gather(*(client(session) for _ in range(args.concurrency)))
+        ingress_elapsed = time.perf_counter() - started
+        while handler.supervisor.stats()["in_flight"] or handler.supervisor.stats()["queued"]:
+            await asyncio.sleep(0.01)
+        elapsed = time.perf_counter() - started
+
+    sup = handler.supervisor.stats()
+    processed = (sup["completed"] - completed_before) if not args.inline else statuses[200]
+    report = {
+        "mode": "inline" if args.inline else "background",
+        "tenants": args.tenants,
+        "updates": args.updates,
+        "concurrency": args.concurrency,
+        "statuses": dict(statuses),
+        "ingress_rps": round(args.updates / ingress_elapsed, 1),
+        "processed_per_second": round(processed / elapsed, 1),
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50) * 1000, 2),
+            "p95": round(percentile(latencies, 95) * 1000, 2),
+            "p99": round(percentile(latencies, 99) * 1000, 2),
+            "mean": round(statistics.fmean(latencies) * 1000, 2) if latencies else 0,
+        },
+        "db_queries_per_update": round(counter.count / max(processed, 1), 3),
+        "bot_api_calls": dict(fake_api.calls),
+        "vault_calls": dict(vault.calls),
+        "supervisor": sup,
+    }
+
+    await app_runner.cleanup()
+    await api_runner.cleanup()
+    await vault_runner.cleanup()
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--tenants", type=int, default=100)
+    parser.add_argument("--users", type=int, default=1000, help="distinct Telegram users")
+    parser.add_argument("--updates", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50, help="parallel webhook clients")
+    parser.add_argument("--callback-share", type=float, default=0.5, help="share of button callbacks")
+    parser.add_argument(
+        "--subscription-share", type=float, default=0.3, help="share of tenants with required subscription"
+    )
+    parser.add_argument("--db-dsn", default="sqlite://:memory:")
+    parser.add_argument("--inline", action="store_true", help="handle updates inside the request")
+    parser.add_argument("--log-level", default="WARNING")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    report = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    lat = report["latency_ms"]
+    print(f"mode                  {report['mode']}")
+    print(f"tenants / updates     {report['tenants']} / {report['updates']} (concurrency {report['concurrency']})")
+    print(f"http statuses         {report['statuses']}")
+    print(f"ingress               {report['ingress_rps']} req/s")
+    print(f"processed             {report['processed_per_second']} updates/s")
+    print(f"latency ms            p50 {lat['p50']}  p95 {lat['p95']}  p99 {lat['p99']}  mean {lat['mean']}")
+    print(f"db queries / update   {report['db_queries_per_update']}")
+    print(f"bot api calls         {report['bot_api_calls']}")
+    print(f"vault calls           {report['vault_calls']}")
+
+
+if __name__ == "__main__":
+    main()
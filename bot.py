@@ -1,18 +1,28 @@
 import asyncio
 import contextlib
+import multiprocessing
+import multiprocessing.connection
+import os
+import signal
+import sys
+import time
+from typing import Any, List, Optional
 
 import aiohttp_cors
 from aiogram import Bot, Dispatcher
 from aiogram.client.default import DefaultBotProperties
 from aiogram.enums import ParseMode
-from aiogram.webhook.aiohttp_server import SimpleRequestHandler
+from aiogram.fsm.storage.base import BaseStorage
+from aiogram.fsm.storage.redis import DefaultKeyBuilder, RedisStorage
 from aiohttp import web
 from aiohttp.web_app import Application
+from redis.asyncio import Redis
 
 from tgbot.bootstrap import load_settings
-from tgbot.common.logging_setup import log
-from tgbot.config import RuntimeSecrets
+from tgbot.common.logging_setup import log, setup_logging
+from tgbot.config import AppSettings, RuntimeSecrets
 from tgbot.database import close_db, start_db
+from tgbot.database.models import Tenant
 from tgbot.filters.admin import AdminFilter
 from tgbot.handlers import (
     admin_router,
@@ -20,13 +30,30 @@ from tgbot.handlers import (
     tenant_admin_router,
     user_tenant_router,
 )
+from tgbot.middlewares.bans import BanCheckMiddleware
 from tgbot.middlewares.context import ContextLoggingMiddleware
-from tgbot.services.request_handler import UUIDBasedRequestHandler
+from tgbot.services.bans import ban_list
+from tgbot.services.bot_identity import bot_identities
+from tgbot.services.cache_bus import BANS, LOCALES, SETTINGS, TENANT, cache_bus
+from tgbot.services.locales import locale_cache
+from tgbot.services.membership import membership_cache
+from tgbot.services.registry import tenant_registry
+from tgbot.services.settings import subscription_cache
+from tgbot.services.supervisor import UpdateSupervisor
+from tgbot.services.telegram_session import create_telegram_session
+from tgbot.services.tenant_users import known_users
+from tgbot.services.write_behind import write_behind
+from tgbot.services.request_handler import (
+    SharedSessionRequestHandler,
+    UUIDBasedRequestHandler,
+)
 
 
 def register_all_handlers(dp: Dispatcher, secrets: RuntimeSecrets):
     # DI + контекст + БД
     dp.update.middleware(ContextLoggingMiddleware())
+    # banned users: in-memory check, updates are dropped
+    dp.update.middleware(BanCheckMiddleware())
 
     # Фильтры
     admin_filter = AdminFilter(secrets.admin_ids or [])
@@ -50,15 +77,79 @@ def register_tenant_handlers(dp: Dispatcher, secrets: RuntimeSecrets):
     )
 
 
-async def create_app() -> Application:
-    app, secrets, _vault, tenant_service = load_settings()
+async def create_app(*, primary: bool = True) -> Application:
+    """
+    Build the webhook application. In multi-worker mode only the `primary`
+    worker creates DB schemas, registers the main webhook and runs the
+    tenant bot health sweep.
+    """
+    app, secrets, _vault, tenant_service = await load_settings()
 
     # DB init
     if secrets.db_dsn:
-        await start_db(secrets.db_dsn)
+        await start_db(secrets.db_dsn, generate_schemas=primary)
     else:
         log.warning("db_dsn_missing")
 
+    # Tenant registry: load tenants once, then keep fresh via invalidation/TTL
+    tenant_registry.configure(
+        ttl_seconds=app.tenant_registry_ttl_seconds,
+        negative_ttl_seconds=app.tenant_registry_negative_ttl_seconds,
+    )
+    if secrets.db_dsn:
+        await tenant_registry.load()
+        # Warm-up: tenant secrets are cached before the server starts accepting updates
+        active_uids = await Tenant.filter(is_active=True).values_list("uuid", flat=True)
+        await tenant_service.warm_up(list(active_uids))
+        log.info("ban_list_loaded", extra={"count": await ban_list.load()})
+    locale_cache.configure(
+        max_tenants=app.locale_cache_max_tenants,
+        ttl_seconds=app.locale_cache_ttl_seconds,
+    )
+    subscription_cache.configure(ttl_seconds=app.settings_cache_ttl_seconds)
+    bot_identities.configure(
+        ttl_seconds=app.bot_identity_ttl_seconds,
+        concurrency=app.bot_identity_concurrency,
+    )
+    membership_cache.configure(
+        positive_ttl_seconds=app.membership_positive_ttl_seconds,
+        negative_ttl_seconds=app.membership_negative_ttl_seconds,
+    )
+    known_users.configure(
+        maxsize=app.known_users_cache_size,
+        ttl_seconds=app.known_users_cache_ttl_seconds,
+    )
+    write_behind.configure(
+        interval_seconds=app.write_behind_interval_ms / 1000,
+        max_batch=app.write_behind_max_batch,
+    )
+
+    # Redis: FSM shared by all replicas + cross-replica cache invalidation
+    redis: Optional[Redis] = None
+    storage: Optional[BaseStorage] = None
+    if app.use_redis and secrets.redis_dsn:
+        redis = Redis.from_url(secrets.redis_dsn)
+        # bot id in the key: FSM data is kept per tenant bot
+        storage = RedisStorage(redis, key_builder=DefaultKeyBuilder(with_bot_id=True))
+        cache_bus.on(TENANT, tenant_registry.invalidate)
+        cache_bus.on(TENANT, tenant_service.invalidate)
+        cache_bus.on(TENANT, bot_identities.invalidate)
+        cache_bus.on(LOCALES, locale_cache.invalidate)
+        cache_bus.on(SETTINGS, subscription_cache.invalidate)
+        cache_bus.on(BANS, ban_list.apply)
+        # after a Redis outage: drop what may have missed invalidations
+        # (tenant contexts revalidate their Vault version on their own)
+        cache_bus.on_resync(tenant_registry.clear)
+        cache_bus.on_resync(bot_identities.clear)
+        cache_bus.on_resync(locale_cache.clear)
+        cache_bus.on_resync(subscription_cache.clear)
+        await cache_bus.start(redis)
+    elif app.http_workers > 1:
+        # in-memory FSM and caches would differ between workers
+        raise RuntimeError("HTTP_WORKERS > 1 requires Redis (Vault:tgbot/common.redis_dsn)")
+    elif app.use_redis:
+        log.warning("redis_dsn_missing")
+
     webapp = web.Application()
     webapp["settings"] = app
     webapp["secrets"] = secrets
@@ -77,14 +168,25 @@ async def create_app() -> Application:
         },
     )
 
+    # One keep-alive connection pool to Bot API for main, tenant and helper bots
+    telegram_session = create_telegram_session(
+        limit=app.telegram_pool_limit,
+        limit_per_host=app.telegram_pool_limit_per_host,
+        keepalive_timeout=app.telegram_keepalive_seconds,
+        api_url=app.telegram_api_url,
+    )
+
     main_bot = Bot(
-        token=secrets.main_bot_token, default=DefaultBotProperties(parse_mode=ParseMode.HTML)
+        token=secrets.main_bot_token,
+        session=telegram_session,
+        default=DefaultBotProperties(parse_mode=ParseMode.HTML),
     )
-    main_dp = Dispatcher()
+    main_dp = Dispatcher(storage=storage)
 
     register_all_handlers(main_dp, secrets)
 
-    main_handler = SimpleRequestHandler(
+    # the shared telegram_session is closed in on_cleanup, after tenant updates drain
+    main_handler = SharedSessionRequestHandler(
         dispatcher=main_dp,
         bot=main_bot,
         secret_token=secrets.webhook_secret,
@@ -92,7 +194,7 @@ async def create_app() -> Application:
     main_handler.register(webapp, path="/webhook/main")
 
     # Multi-Tenant webhook
-    tenant_dp = Dispatcher()
+    tenant_dp = Dispatcher(storage=storage)
 
     register_tenant_handlers(tenant_dp, secrets)
 
@@ -101,35 +203,101 @@ async def create_app() -> Application:
         tenant_service=tenant_service,
         secret_token=secrets.webhook_secret,
         bot_settings={"default": DefaultBotProperties(parse_mode=ParseMode.HTML)},
+        registry=tenant_registry,
+        max_bots=app.bot_pool_max_size,
+        bot_idle_seconds=app.bot_pool_idle_seconds,
+        session=telegram_session,
+        supervisor=UpdateSupervisor(
+            max_concurrency=app.updates_max_concurrency,
+            per_tenant_concurrency=app.updates_per_tenant_concurrency,
+            queue_size=app.updates_queue_size,
+            per_tenant_queue_size=app.updates_per_tenant_queue_size,
+            quantum=app.updates_fair_quantum,
+            overflow=app.updates_overflow_policy,
+        ),
         # session_factory=db_core.Session,
     )
     tenant_handler.register(webapp, path="/webhook/{uid}")
+    webapp["tenant_handler"] = tenant_handler
+    # deleted/revoked tenants: drop their pooled Bot here and on other replicas
+    main_dp["bot_pool"] = tenant_handler.bots
+    if redis is not None:
+        cache_bus.on(TENANT, tenant_handler.bots.discard)
+
+    async def metrics(_request: web.Request) -> web.Response:
+        return web.json_response(
+            {
+                "bot_pool": tenant_handler.bots.stats(),
+                "locale_cache": locale_cache.stats(),
+                "updates": tenant_handler.supervisor.stats(),
+                "bans": ban_list.stats(),
+                "write_behind": write_behind.stats(),
+            }
+        )
+
+    webapp.router.add_get("/metrics", metrics)
 
 
     async def on_startup(_):
-        main_url = f"{app.external_base_url}/webhook/main"
-        await main_bot.set_webhook(
-            url=main_url,
-            secret_token=secrets.webhook_secret,
-            drop_pending_updates=True,
-        )
-        log.info("main_webhook_set", extra={"url": main_url})
+        if secrets.db_dsn:
+            write_behind.start()
+
+        if primary:
+            main_url = f"{app.external_base_url}/webhook/main"
+            await main_bot.set_webhook(
+                url=main_url,
+                secret_token=secrets.webhook_secret,
+                drop_pending_updates=True,
+            )
+            log.info("main_webhook_set", extra={"url": main_url})
+
+        # renew tenant contexts before TTL expiry, off the hot path
+        if app.vault_refresh_ahead_seconds > 0:
+            webapp["refresh_task"] = asyncio.create_task(
+                tenant_service.run_refresher(
+                    ahead_seconds=app.vault_refresh_ahead_seconds,
+                    interval=app.vault_refresh_interval_seconds,
+                )
+            )
+
+        if secrets.db_dsn and app.ban_list_reload_seconds > 0:
+            webapp["ban_reload_task"] = asyncio.create_task(
+                ban_list.run_reloader(app.ban_list_reload_seconds)
+            )
+
+        # periodic tenant bot health sweep (identities + revoked tokens)
+        if primary and secrets.db_dsn:
+            webapp["cleanup_task"] = asyncio.create_task(
+                bot_identities.run_sweeps(
+                    tenant_service,
+                    _vault,
+                    telegram_session,
+                    interval=app.bot_health_sweep_interval_seconds,
+                    bots=tenant_handler.bots,
+                )
+            )
 
     async def on_cleanup(_):
         # останавливаем фон
-        task = webapp.get("cleanup_task")
-        if task:
-            task.cancel()
-            with contextlib.suppress(Exception):
-                await task
+        for key in ("cleanup_task", "refresh_task", "ban_reload_task"):
+            task = webapp.get(key)
+            if task:
+                task.cancel()
+                with contextlib.suppress(BaseException):
+                    await task
         fx_task = webapp.get("fx_task")  # <-- ДОБАВЛЕНО
         if fx_task:
             fx_task.cancel()
             with contextlib.suppress(Exception):
                 await fx_task
-        await main_bot.session.close()
-        for dp_bot in tenant_handler.bots.values():
-            await dp_bot.session.close()
+        await tenant_handler.bots.close()
+        # pending signups must reach the DB before it is closed
+        await write_behind.close()
+        await telegram_session.close()
+        if redis is not None:
+            await cache_bus.close()
+            await redis.aclose()
+        await _vault.close()
         with contextlib.suppress(Exception):
             await close_db()
 
@@ -140,17 +308,108 @@ async def create_app() -> Application:
     return webapp
 
 
-async def main():
-    app = await create_app()
+async def serve(
+    *, primary: bool = True, reuse_port: bool = False, ready: Optional[Any] = None
+) -> None:
+    """Run the webhook server until SIGINT/SIGTERM, then clean up."""
+    app = await create_app(primary=primary)
     settings = app["settings"]
 
     runner = web.AppRunner(app)
     await runner.setup()
-    site = web.TCPSite(runner, host=settings.http_host, port=settings.http_port)
+    site = web.TCPSite(
+        runner, host=settings.http_host, port=settings.http_port, reuse_port=reuse_port
+    )
     await site.start()
-
-    await asyncio.Event().wait()
+    if ready is not None:
+        ready.set()
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        with contextlib.suppress(NotImplementedError):
+            loop.add_signal_handler(sig, stop.set)
+    try:
+        await stop.wait()
+    finally:
+        log.info("http_stopping")
+        await runner.cleanup()
+
+
+def _run_worker(index: int, ready: Any) -> None:
+    asyncio.run(serve(primary=index == 0, reuse_port=True, ready=ready))
+
+
+def run_workers(count: int, *, shutdown_timeout: float = 30) -> int:
+    """
+    Multi-process mode: `count` workers, each with its own event loop,
+    DB pool and caches, share the listening port via SO_REUSEPORT.
+    Worker 0 (primary) starts first and finishes startup (schemas, main
+    webhook) before the rest start. SIGINT/SIGTERM is forwarded to all
+    workers; if one worker dies, the others are stopped too.
+    Returns the exit code.
+    """
+    # spawn: workers must not inherit the parent's interpreter state
+    mp = multiprocessing.get_context("spawn")
+    workers: List[multiprocessing.process.BaseProcess] = []
+    stopping = False
+
+    def stop_workers(*_: Any) -> None:
+        nonlocal stopping
+        stopping = True
+        for proc in workers:
+            if proc.is_alive():
+                os.kill(proc.pid, signal.SIGTERM)
+
+    signal.signal(signal.SIGINT, stop_workers)
+    signal.signal(signal.SIGTERM, stop_workers)
+
+    for index in range(count):
+        if stopping:
+            break
+        # only the primary reports readiness; the rest start after it
+        ready = mp.Event() if index == 0 else None
+        proc = mp.Process(target=_run_worker, args=(index, ready), name=f"http-{index}")
+        proc.start()
+        workers.append(proc)
+        if index == 0:
+            while not ready.wait(0.5):
+                if not proc.is_alive():
+                    if stopping:
+                        return 0
+                    log.error("http_primary_failed", extra={"exitcode": proc.exitcode})
+                    return proc.exitcode or 1
+    log.info("http_workers_started", extra={"count": len(workers)})
+
+    multiprocessing.connection.wait([proc.sentinel for proc in workers])
+    crashed = not stopping
+    if crashed:
+        failed = [p.name for p in workers if not p.is_alive()]
+        log.error("http_worker_exited", extra={"workers": failed})
+        stop_workers()
+
+    deadline = time.monotonic() + shutdown_timeout
+    for proc in workers:
+        proc.join(max(deadline - time.monotonic(), 0))
+        if proc.is_alive():
+            log.warning("http_worker_killed", extra={"worker": proc.name})
+            proc.kill()
+            proc.join()
+    return 1 if crashed else 0
+
+
+def main() -> None:
+    settings = AppSettings()
+    if settings.http_workers <= 1:
+        asyncio.run(serve())
+        return
+    setup_logging(settings.log_level)
+    if not settings.use_redis:
+        # FSM states and cache invalidations must be shared by all workers
+        log.error("http_workers_require_redis", extra={"workers": settings.http_workers})
+        sys.exit(1)
+    sys.exit(run_workers(settings.http_workers))
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    main()
@@ -1,4 +1,4 @@
-from typing import Dict, Tuple
+from typing import Dict, Optional, Tuple
 
 from hvac import exceptions as hvac_exceptions
 
@@ -13,8 +13,12 @@ KV_WEBHOOK_SECRET = "tgbot/common/webhook_secret"
 KV_DB_DSN = "tgbot/common/db_dsn"
 KV_REDIS_DSN = "tgbot/common/redis_dsn"
 
+Settings = Tuple[AppSettings, RuntimeSecrets, VaultClient, TenantService]
 
-def _read_secret(
+_loaded: Optional[Settings] = None
+
+
+async def _read_secret(
     vault: VaultClient,
     path: str,
     *,
@@ -25,12 +29,12 @@ def _read_secret(
     """Read a secret from Vault and provide graceful fallbacks in non-prod envs."""
 
     try:
-        return vault.read_kv(path)
+        return await vault.read_kv(path)
     except hvac_exceptions.InvalidPath:
         if fallbacks:
             for alt in fallbacks:
                 try:
-                    data = vault.read_kv(alt)
+                    data = await vault.read_kv(alt)
                 except hvac_exceptions.InvalidPath:
                     continue
                 else:
@@ -50,7 +54,16 @@ def _read_secret(
         raise
 
 
-def load_settings() -> Tuple[AppSettings, RuntimeSecrets, VaultClient, TenantService]:
+async def load_settings() -> Settings:
+    """
+    Load settings and secrets once per process; later calls return the same
+    objects, so the webhook server and handlers share one Vault client and
+    one TenantService cache.
+    """
+    global _loaded
+    if _loaded is not None:
+        return _loaded
+
     app = AppSettings()
     setup_logging(app.log_level)
 
@@ -63,21 +76,22 @@ def load_settings() -> Tuple[AppSettings, RuntimeSecrets, VaultClient, TenantSer
         mount=app.vault_kv_mount,
         ttl=app.vault_ttl_seconds,
     )
+    await vault.login()
 
     # global/common secrets
-    webhook_secret = _read_secret(vault, KV_WEBHOOK_SECRET, env=app.env)
+    webhook_secret = await _read_secret(vault, KV_WEBHOOK_SECRET, env=app.env)
     secrets.webhook_secret = webhook_secret.get("webhook_secret")
 
-    db_secret = _read_secret(vault, KV_DB_DSN, env=app.env, optional=True)
+    db_secret = await _read_secret(vault, KV_DB_DSN, env=app.env, optional=True)
     secrets.db_dsn = db_secret.get("db_dsn")
 
-    redis_secret = _read_secret(
+    redis_secret = await _read_secret(
         vault, KV_REDIS_DSN, env=app.env, optional=not app.use_redis
     )
     secrets.redis_dsn = redis_secret.get("redis_dsn")
 
     # main bot
-    main = _read_secret(
+    main = await _read_secret(
         vault,
         KV_MAIN_BOT,
         env=app.env,
@@ -110,5 +124,13 @@ def load_settings() -> Tuple[AppSettings, RuntimeSecrets, VaultClient, TenantSer
             raise RuntimeError("Missing required secrets: " + ", ".join(missing))
 
     log.info("bootstrap_ok", extra={"env": app.env})
-    tenant_service = TenantService(vault, ttl_seconds=app.vault_ttl_seconds)
-    return app, secrets, vault, tenant_service
+    tenant_service = TenantService(
+        vault,
+        ttl_seconds=app.vault_ttl_seconds,
+        stale_ttl_seconds=app.vault_stale_ttl_seconds,
+        change_detection=app.vault_change_detection,
+        version_check_seconds=app.vault_version_check_seconds,
+        data_ttl_seconds=app.vault_data_ttl_seconds,
+    )
+    _loaded = (app, secrets, vault, tenant_service)
+    return _loaded
@@ -12,6 +12,11 @@ class AppSettings(BaseSettings):
     # http server (aiohttp webhook)
     http_host: str = Field("0.0.0.0", validation_alias="HTTP_HOST")
     http_port: int = Field(8080, validation_alias="HTTP_PORT")
+    # >1: spawn that many fresh server processes sharing the port (SO_REUSEPORT);
+    # nothing is inherited, each worker loads its own settings and caches
+    http_workers: int = Field(1, validation_alias="HTTP_WORKERS")
+    # Bot API base URL; empty -> https://api.telegram.org
+    telegram_api_url: Optional[str] = Field(None, validation_alias="TELEGRAM_API_URL")
 
     # features
     use_redis: bool = Field(True, validation_alias="USE_REDIS")
@@ -26,6 +31,111 @@ class AppSettings(BaseSettings):
     vault_secret_id: Optional[str] = Field(None, validation_alias="VAULT_SECRET_ID")
     vault_kv_mount: str = Field("kv", validation_alias="VAULT_KV_MOUNT")
     vault_ttl_seconds: int = Field(60, validation_alias="VAULT_TTL_SECONDS")
+    # serve expired tenant contexts up to this age while refreshing in background
+    vault_stale_ttl_seconds: int = Field(600, validation_alias="VAULT_STALE_TTL_SECONDS")
+    # renew tenant contexts this long before their TTL ends (0 disables)
+    vault_refresh_ahead_seconds: int = Field(15, validation_alias="VAULT_REFRESH_AHEAD_SECONDS")
+    vault_refresh_interval_seconds: int = Field(5, validation_alias="VAULT_REFRESH_INTERVAL_SECONDS")
+    # on refresh, compare KV v2 metadata current_version before re-reading secrets
+    vault_change_detection: bool = Field(True, validation_alias="VAULT_CHANGE_DETECTION")
+    # with change detection: version check cadence and max age of secret data
+    vault_version_check_seconds: int = Field(30, validation_alias="VAULT_VERSION_CHECK_SECONDS")
+    vault_data_ttl_seconds: int = Field(3600, validation_alias="VAULT_DATA_TTL_SECONDS")
+
+    # Tenant registry (in-memory tenants table cache)
+    tenant_registry_ttl_seconds: int = Field(
+        300, validation_alias="TENANT_REGISTRY_TTL_SECONDS"
+    )
+    tenant_registry_negative_ttl_seconds: int = Field(
+        30, validation_alias="TENANT_REGISTRY_NEGATIVE_TTL_SECONDS"
+    )
+
+    # Locale cache (LRU by tenant, fallback TTL for missed invalidations)
+    locale_cache_max_tenants: int = Field(
+        10_000, validation_alias="LOCALE_CACHE_MAX_TENANTS"
+    )
+    locale_cache_ttl_seconds: int = Field(600, validation_alias="LOCALE_CACHE_TTL_SECONDS")
+
+    # Tenant settings cache (fallback TTL, writers refresh entries)
+    settings_cache_ttl_seconds: int = Field(
+        300, validation_alias="SETTINGS_CACHE_TTL_SECONDS"
+    )
+
+    # Channel membership cache (get_chat_member results)
+    membership_positive_ttl_seconds: int = Field(
+        300, validation_alias="MEMBERSHIP_POSITIVE_TTL_SECONDS"
+    )
+    membership_negative_ttl_seconds: int = Field(
+        15, validation_alias="MEMBERSHIP_NEGATIVE_TTL_SECONDS"
+    )
+
+    # Shared Bot API HTTP session (connection pool for all bots)
+    telegram_pool_limit: int = Field(100, validation_alias="TELEGRAM_POOL_LIMIT")
+    telegram_pool_limit_per_host: int = Field(
+        0, validation_alias="TELEGRAM_POOL_LIMIT_PER_HOST"
+    )
+    telegram_keepalive_seconds: float = Field(
+        60, validation_alias="TELEGRAM_KEEPALIVE_SECONDS"
+    )
+
+    # Tenant Bot instances pool (webhook handler)
+    bot_pool_max_size: int = Field(1000, validation_alias="BOT_POOL_MAX_SIZE")
+    bot_pool_idle_seconds: float = Field(3600, validation_alias="BOT_POOL_IDLE_SECONDS")
+
+    # Tenant bot identities (menus) and periodic token health sweep
+    bot_identity_ttl_seconds: int = Field(86_400, validation_alias="BOT_IDENTITY_TTL_SECONDS")
+    bot_identity_concurrency: int = Field(10, validation_alias="BOT_IDENTITY_CONCURRENCY")
+    bot_health_sweep_interval_seconds: float = Field(
+        3600, validation_alias="BOT_HEALTH_SWEEP_INTERVAL_SECONDS"
+    )
+
+    # Broadcasts (tenant mailings)
+    broadcast_concurrency: int = Field(10, validation_alias="BROADCAST_CONCURRENCY")
+    broadcast_rate_per_second: float = Field(
+        25, validation_alias="BROADCAST_RATE_PER_SECOND"
+    )
+    broadcast_page_size: int = Field(500, validation_alias="BROADCAST_PAGE_SIZE")
+    broadcast_progress_interval_seconds: float = Field(
+        5, validation_alias="BROADCAST_PROGRESS_INTERVAL_SECONDS"
+    )
+    # broadcast worker (worker.py)
+    broadcast_max_jobs: int = Field(4, validation_alias="BROADCAST_MAX_JOBS")
+    broadcast_lease_seconds: int = Field(120, validation_alias="BROADCAST_LEASE_SECONDS")
+    broadcast_poll_interval_seconds: float = Field(
+        2, validation_alias="BROADCAST_POLL_INTERVAL_SECONDS"
+    )
+    broadcast_token_attempts: int = Field(5, validation_alias="BROADCAST_TOKEN_ATTEMPTS")
+    broadcast_token_backoff_seconds: float = Field(
+        30, validation_alias="BROADCAST_TOKEN_BACKOFF_SECONDS"
+    )
+
+    # tenant subscribers already stored in DB (skip redundant upserts)
+    known_users_cache_size: int = Field(200_000, validation_alias="KNOWN_USERS_CACHE_SIZE")
+    known_users_cache_ttl_seconds: int = Field(
+        86_400, validation_alias="KNOWN_USERS_CACHE_TTL_SECONDS"
+    )
+
+    # write-behind batching of user/subscriber signups
+    write_behind_interval_ms: int = Field(200, validation_alias="WRITE_BEHIND_INTERVAL_MS")
+    write_behind_max_batch: int = Field(500, validation_alias="WRITE_BEHIND_MAX_BATCH")
+
+    # in-memory ban list: full reload from DB (0 = only at startup)
+    ban_list_reload_seconds: int = Field(300, validation_alias="BAN_LIST_RELOAD_SECONDS")
+
+    # tenant webhook updates handled in background (bounded)
+    updates_max_concurrency: int = Field(200, validation_alias="UPDATES_MAX_CONCURRENCY")
+    updates_per_tenant_concurrency: int = Field(
+        10, validation_alias="UPDATES_PER_TENANT_CONCURRENCY"
+    )
+    updates_queue_size: int = Field(5000, validation_alias="UPDATES_QUEUE_SIZE")
+    updates_per_tenant_queue_size: int = Field(
+        500, validation_alias="UPDATES_PER_TENANT_QUEUE_SIZE"
+    )
+    # updates a tenant may start per round-robin turn
+    updates_fair_quantum: int = Field(1, validation_alias="UPDATES_FAIR_QUANTUM")
+    updates_overflow_policy: str = Field(
+        "reject", validation_alias="UPDATES_OVERFLOW_POLICY"
+    )  # reject|drop_oldest
 
     model_config = {
         "env_file": ".env",
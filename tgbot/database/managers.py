@@ -1,15 +1,54 @@
 """Database models management module."""
 
 import logging
+from contextvars import ContextVar
 from datetime import datetime
-from typing import Any, Coroutine, List, Optional
+from decimal import Decimal
+from numbers import Real
+from typing import Any, Coroutine, Dict, Iterable, List, Mapping, Optional
 
+from tortoise.backends.base.client import BaseDBAsyncClient
 from tortoise.exceptions import IntegrityError, OperationalError
+from tortoise.transactions import in_transaction
 
-from tgbot.database.models import Tenant, TenantLocale, User
+from tgbot.database.models import (
+    Tenant,
+    TenantLocale,
+    TenantSettings,
+    TenantUser,
+    User,
+)
 
 logger = logging.getLogger("managers")
 
+# Per-update cache of User rows (tg_id -> User or None), set by middleware;
+# None outside of update handling.
+user_rows_var: ContextVar[Optional[Dict[int, Optional[User]]]] = ContextVar(
+    "user_rows", default=None
+)
+
+# rows per statement in batch balance updates (keeps bind params < 32767)
+BALANCE_BATCH_SIZE = 5000
+# rows per INSERT in bulk signups (tenant_user binds 6 columns per row)
+BULK_CREATE_BATCH_SIZE = 1000
+
+
+def _placeholders(conn: BaseDBAsyncClient, count: int) -> List[str]:
+    """Positional bind markers for raw SQL on the given connection."""
+    if conn.capabilities.dialect == "postgres":
+        return [f"${i}" for i in range(1, count + 1)]
+    return ["?"] * count
+
+
+def _whole_amount(amount: Any) -> int:
+    """Balance delta as int; fractional or non-numeric values are rejected,
+    never truncated."""
+    if isinstance(amount, bool) or not isinstance(amount, (Real, Decimal)):
+        raise TypeError(f"Balance amount must be a number, got {type(amount).__name__}")
+    if amount != int(amount):
+        raise ValueError(f"Balance amount must be a whole number, got {amount!r}")
+    return int(amount)
+
 
 class UserManager:
     "Basic user manager class."
@@ -28,6 +67,7 @@ class UserManager:
             user = await User.create(
                 tg_id=self.user_id,
             )
+            self._remember(user)
             return user
         except IntegrityError as e:
             if "duplicate" in str(e):
@@ -35,20 +75,46 @@ class UserManager:
                 return user
             logger.warning("IntegrityError: %s", e)
 
+    @staticmethod
+    async def create_many(tg_ids: Iterable[int]) -> None:
+        """Creates users in one multi-row INSERT, skipping existing ones."""
+        users = [User(tg_id=tg_id) for tg_id in tg_ids]
+        if not users:
+            return
+        await User.bulk_create(
+            users, batch_size=BULK_CREATE_BATCH_SIZE, ignore_conflicts=True
+        )
+
+    def _remember(self, user: Optional[User]) -> None:
+        rows = user_rows_var.get()
+        if rows is not None:
+            rows[self.user_id] = user
+
     async def get(self) -> User:
-        """Gets a user from the database."""
+        """Gets a user from the database (at most once per update)."""
+        rows = user_rows_var.get()
+        if rows is not None and self.user_id in rows:
+            return rows[self.user_id]
         try:
             user = await User.filter(tg_id=self.user_id).first()
-            return user
         except OperationalError as e:
             logger.warning("Could not get user due to %s", e)
             return None
+        self._remember(user)
+        return user
+
+    async def _column(self, name: str) -> Any:
+        """Single column of the user: from the per-update row if handling
+        an update, otherwise a one-column projection query."""
+        if user_rows_var.get() is not None:
+            user = await self.get()
+            return getattr(user, name) if user is not None else None
+        return await User.filter(tg_id=self.user_id).first().values_list(name, flat=True)
 
     async def get_ban(self) -> bool:
         """Gets user ban status from the database."""
         try:
-            user = await User.filter(tg_id=self.user_id).first()
-            return user.ban
+            return bool(await self._column("ban"))
         except OperationalError as e:
             logger.warning("Could not get user ban due to %s", e)
             return False
@@ -73,39 +139,113 @@ class UserManager:
             int: The amount of days.
         """
         try:
-            today = datetime.today()
-            user = await User.filter(tg_id=self.user_id).first()
-            delta = today - user.register_date
+            register_date = await self._column("register_date")
+            if register_date is None:
+                return 0
+            delta = datetime.now(register_date.tzinfo) - register_date
             return delta.days
         except OperationalError as e:
             logger.warning("DoesNotExist: %s", e)
 
-    async def update_balance(self, amount: float) -> None:
-        """Updates user's balance with the given amount.
+    async def update_balance(self, amount: int) -> Optional[int]:
+        """Atomically adds the given amount to user's balance.
+
+        Single `UPDATE ... SET balance = balance + x RETURNING balance`
+        statement, so concurrent updates never overwrite each other.
 
         Args:
-            amount (float): Amount to update.
+            amount (int): Amount to add (negative to withdraw).
+
+        Returns:
+            Optional[int]: The new balance, None if the user does not exist.
+
+        Raises:
+            TypeError, ValueError: `amount` is not a whole number.
         """
+        amount = _whole_amount(amount)
+        conn = User._meta.db
+        p = _placeholders(conn, 2)
+        table = User._meta.db_table
         try:
-            user = await User.filter(tg_id=self.user_id).first()
-            amnew = user.balance + float(amount)
-            await User.filter(tg_id=self.user_id).update(balance=amnew)
+            rows = await conn.execute_query_dict(
+                f'UPDATE "{table}" SET "balance" = "balance" + {p[0]} '
+                f'WHERE "tg_id" = {p[1]} RETURNING "balance"',
+                [amount, self.user_id],
+            )
         except OperationalError as e:
             logger.warning("Could not update user balance due to %s", e)
+            return None
+        if not rows:
+            return None
+        balance = rows[0]["balance"]
+        cached = (user_rows_var.get() or {}).get(self.user_id)
+        if cached is not None:
+            cached.balance = balance
+        return balance
+
+    @staticmethod
+    async def update_balances(deltas: Mapping[int, int]) -> Dict[int, int]:
+        """Atomically applies many balance changes (payouts, refunds).
+
+        One `UPDATE ... FROM (VALUES ...) RETURNING` statement per
+        BALANCE_BATCH_SIZE users, all in one transaction.
+
+        Args:
+            deltas (Mapping[int, int]): tg_id -> amount to add.
+
+        Returns:
+            Dict[int, int]: tg_id -> new balance; unknown users are absent.
 
-    async def ban(self) -> None:
-        """Bans user."""
+        Raises:
+            TypeError, ValueError: an amount is not a whole number.
+        """
+        items = [(int(tg_id), _whole_amount(amount)) for tg_id, amount in deltas.items()]
+        if not items:
+            return {}
+        table = User._meta.db_table
+        balances: Dict[int, int] = {}
+        async with in_transaction() as conn:
+            for start in range(0, len(items), BALANCE_BATCH_SIZE):
+                chunk = items[start : start + BALANCE_BATCH_SIZE]
+                p = _placeholders(conn, 2 * len(chunk))
+                values = ", ".join(
+                    f"(CAST({p[2 * i]} AS BIGINT), CAST({p[2 * i + 1]} AS BIGINT))"
+                    for i in range(len(chunk))
+                )
+                rows = await conn.execute_query_dict(
+                    f'WITH "d" ("tg_id", "delta") AS (VALUES {values}) '
+                    f'UPDATE "{table}" SET "balance" = "{table}"."balance" + "d"."delta" '
+                    f'FROM "d" WHERE "{table}"."tg_id" = "d"."tg_id" '
+                    f'RETURNING "{table}"."tg_id", "{table}"."balance"',
+                    [value for pair in chunk for value in pair],
+                )
+                balances.update((row["tg_id"], row["balance"]) for row in rows)
+        return balances
+
+    async def ban(self) -> bool:
+        """Bans user. Returns False if the DB update failed."""
         try:
             await User.filter(tg_id=self.user_id).update(ban=True)
         except OperationalError as e:
             logger.warning("Could not ban user %s", e)
+            return False
+        self._set_cached_ban(True)
+        return True
 
-    async def unban(self) -> None:
-        """Unbans user."""
+    async def unban(self) -> bool:
+        """Unbans user. Returns False if the DB update failed."""
         try:
             await User.filter(tg_id=self.user_id).update(ban=False)
         except OperationalError as e:
             logger.warning("Could not unban user %s", e)
+            return False
+        self._set_cached_ban(False)
+        return True
+
+    def _set_cached_ban(self, value: bool) -> None:
+        cached = (user_rows_var.get() or {}).get(self.user_id)
+        if cached is not None:
+            cached.ban = value
 
 
 class TenantManager:
@@ -115,8 +255,12 @@ class TenantManager:
         self.owner_id = owner_id
 
     async def create(self, uid: str, name: str | None = None) -> Optional[Tenant]:
+        """Creates tenant together with its settings row (kept off the hot path)."""
         try:
-            return await Tenant.create(owner_id=self.owner_id, uuid=uid, name=name)
+            async with in_transaction():
+                tenant = await Tenant.create(owner_id=self.owner_id, uuid=uid, name=name)
+                await TenantSettings.create(tenant=tenant)
+            return tenant
         except IntegrityError as e:
             logger.warning("IntegrityError on tenant.create: %s", e)
             return None
@@ -151,8 +295,32 @@ class TenantManager:
             logger.warning("Could not delete tenant due to %s", e)
 
 
+class TenantUserManager:
+    """DB manager for tenant bot subscribers."""
+
+    @staticmethod
+    async def upsert_many(users: Iterable[TenantUser]) -> None:
+        """
+        Insert subscribers or refresh their profile (full_name, username)
+        with INSERT ... ON CONFLICT (tenant_id, tg_id) DO UPDATE, one
+        statement per BULK_CREATE_BATCH_SIZE rows.
+        """
+        users = list(users)
+        if not users:
+            return
+        await TenantUser.bulk_create(
+            users,
+            batch_size=BULK_CREATE_BATCH_SIZE,
+            on_conflict=["tenant_id", "tg_id"],
+            update_fields=["full_name", "username", "updated_at"],
+        )
+
+
 class TenantLocaleManager:
-    """Helper for working with tenant locales."""
+    """
+    Helper for working with tenant locales (storage only). Edits that must
+    reach the locale cache go through TenantLocaleService.update_locale.
+    """
 
     def __init__(self, tenant_id: int, lang: str = "ru"):
         self.tenant_id = tenant_id
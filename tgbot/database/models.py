@@ -106,3 +106,42 @@ class TenantSettings(Model):
 
     class Meta:
         table = "tenant_settings"
+
+
+class Broadcast(Model):
+    """
+    Tenant mailing job. Recipients are processed in TenantUser.id order and
+    `cursor` stores the last processed id, so a restart resumes from there.
+    """
+
+    STATUS_PENDING = "pending"
+    STATUS_RUNNING = "running"
+    STATUS_DONE = "done"
+    STATUS_FAILED = "failed"
+
+    id = fields.BigIntField(pk=True)
+    tenant = fields.ForeignKeyField(
+        "models.Tenant", related_name="broadcasts", on_delete=fields.CASCADE
+    )
+    from_chat_id = fields.BigIntField()
+    message_id = fields.BigIntField()
+    # admin-side message edited with live counters
+    progress_message_id = fields.BigIntField(null=True)
+    status = fields.CharField(max_length=16, default=STATUS_PENDING, index=True)
+    cursor = fields.BigIntField(default=0)
+    sent = fields.IntField(default=0)
+    failed = fields.IntField(default=0)
+    created_at = fields.DatetimeField(auto_now_add=True)
+    updated_at = fields.DatetimeField(auto_now=True)
+
+    def __str__(self):
+        return (
+            "Broadcast: "
+            f"id={self.id} "
+            f"status={self.status} "
+            f"sent={self.sent} "
+            f"failed={self.failed}"
+        )
+
+    class Meta:
+        table = "tenant_broadcast"
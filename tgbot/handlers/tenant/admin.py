@@ -4,7 +4,6 @@ from aiogram import Router
 from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
-from aiogram.exceptions import TelegramBadRequest, TelegramForbiddenError
 from aiogram.types import CallbackQuery, Message
 
 from tgbot.filters.tenant_admin import TenantAdminFilter
@@ -14,6 +13,7 @@ from tgbot.keyboards.tenant.inline import (
     main_keyboard,
     tenant_locale_admin_keyboard,
 )
+from tgbot.services.broadcast import broadcast_engine
 from tgbot.services.context import get_current_tenant
 from tgbot.services.locales import (
     BUTTON_KEYS,
@@ -231,32 +231,22 @@ async def send_broadcast(message: Message, state: FSMContext) -> None:
         await message.answer("Не удалось определить текущий тенант.")
         return
 
-    user_ids = await TenantUser.filter(tenant_id=tenant.numeric_id).values_list("tg_id", flat=True)
-    if not user_ids:
+    has_users = await TenantUser.filter(tenant_id=tenant.numeric_id).exists()
+    if not has_users:
         await state.clear()
         await message.answer("Нет пользователей для рассылки.")
         await _send_admin_panel(message)
         return
 
-    sent = 0
-    failed = 0
-    for user_id in user_ids:
-        try:
-            await message.bot.copy_message(
-                chat_id=user_id,
-                from_chat_id=message.chat.id,
-                message_id=message.message_id,
-            )
-            sent += 1
-        except (TelegramForbiddenError, TelegramBadRequest):
-            failed += 1
+    # Sending is done by the broadcast worker; it edits the progress message
+    await broadcast_engine.enqueue(
+        message.bot,
+        tenant_id=tenant.numeric_id,
+        from_chat_id=message.chat.id,
+        message_id=message.message_id,
+    )
 
     await state.clear()
-    await message.answer(
-        "Рассылка завершена."
-        f" Отправлено: {sent}."
-        f" Ошибок: {failed}."
-    )
     await _send_admin_panel(message)
 
 
@@ -5,7 +5,6 @@ from aiogram.exceptions import TelegramBadRequest, TelegramForbiddenError
 from aiogram.filters import CommandStart
 from aiogram.types import CallbackQuery, Message
 
-from tgbot.database.models import TenantUser
 from tgbot.keyboards.tenant.inline import (
     CHECK_SUBSCRIPTION_CALLBACK,
     main_keyboard,
@@ -17,7 +16,9 @@ from tgbot.services.locales import (
     START_MESSAGE_KEY,
     TenantLocaleService,
 )
+from tgbot.services.membership import membership_cache
 from tgbot.services.settings import TenantSettingsService
+from tgbot.services.tenant_users import known_users
 
 
 user_tenant_router = Router(name="user_router")
@@ -36,29 +37,40 @@ async def _get_settings_service() -> TenantSettingsService:
 async def _register_tenant_user(tenant_id: int, telegram_user) -> None:
     if telegram_user is None:
         return
+    # no DB access for known users with an unchanged profile
+    await known_users.register(tenant_id, telegram_user)
+
+
+async def _is_channel_member(
+    message: Message | CallbackQuery,
+    tenant_id: int,
+    chat_reference: str,
+    user_id: int,
+    *,
+    force_check: bool = False,
+) -> bool:
+    """Check membership via get_chat_member, cached per (tenant, channel, user)."""
+    if not force_check:
+        cached = membership_cache.get(tenant_id, chat_reference, user_id)
+        if cached is not None:
+            return cached
 
-    defaults = {
-        "full_name": getattr(telegram_user, "full_name", None),
-        "username": getattr(telegram_user, "username", None),
-    }
-    tenant_user, created = await TenantUser.get_or_create(
-        tenant_id=tenant_id,
-        tg_id=telegram_user.id,
-        defaults=defaults,
-    )
-    if created:
-        return
+    try:
+        member = await message.bot.get_chat_member(  # type: ignore[arg-type]
+            chat_reference, user_id
+        )
+    except (TelegramBadRequest, TelegramForbiddenError):
+        member = None
 
-    updates = {}
-    if tenant_user.full_name != defaults["full_name"]:
-        updates["full_name"] = defaults["full_name"]
-    if tenant_user.username != defaults["username"]:
-        updates["username"] = defaults["username"]
-    if updates:
-        await TenantUser.filter(id=tenant_user.id).update(**updates)
+    status = getattr(member, "status", None)
+    is_member = status not in {"left", "kicked", None}
+    membership_cache.put(tenant_id, chat_reference, user_id, is_member)
+    return is_member
 
 
-async def _ensure_subscription(message: Message | CallbackQuery) -> bool:
+async def _ensure_subscription(
+    message: Message | CallbackQuery, *, force_check: bool = False
+) -> bool:
     try:
         settings_service = await _get_settings_service()
     except LookupError:
@@ -80,15 +92,13 @@ async def _ensure_subscription(message: Message | CallbackQuery) -> bool:
     if telegram_user is None:
         return False
 
-    try:
-        member = await message.bot.get_chat_member(  # type: ignore[arg-type]
-            chat_reference, telegram_user.id
-        )
-    except (TelegramBadRequest, TelegramForbiddenError):
-        member = None
-
-    status = getattr(member, "status", None)
-    is_member = status not in {"left", "kicked", None}
+    is_member = await _is_channel_member(
+        message,
+        settings_service.tenant_id,
+        chat_reference,
+        telegram_user.id,
+        force_check=force_check,
+    )
 
     if is_member:
         tenant = await get_current_tenant()
@@ -112,9 +122,11 @@ async def _ensure_subscription(message: Message | CallbackQuery) -> bool:
 
 async def _send_start_content(message: Message) -> None:
     locale_service = await _get_locale_service()
-    start_locale = await locale_service.get_locale(START_MESSAGE_KEY)
-    button_locales = await locale_service.get_locales(BUTTON_KEYS)
-    await message.answer(start_locale.text, reply_markup=main_keyboard(button_locales))
+    locales = await locale_service.get_locales((START_MESSAGE_KEY, *BUTTON_KEYS))
+    button_locales = {key: locales[key] for key in BUTTON_KEYS}
+    await message.answer(
+        locales[START_MESSAGE_KEY].text, reply_markup=main_keyboard(button_locales)
+    )
 
 
 @user_tenant_router.message(CommandStart())
@@ -141,7 +153,8 @@ async def answer_user(call: CallbackQuery):
 
 @user_tenant_router.callback_query(F.data == CHECK_SUBSCRIPTION_CALLBACK)
 async def recheck_subscription(call: CallbackQuery):
-    if await _ensure_subscription(call):
+    # Explicit re-check: bypass the membership cache
+    if await _ensure_subscription(call, force_check=True):
         await call.answer("Подписка подтверждена!", show_alert=True)
         await _send_start_content(call.message)
     else:
@@ -12,7 +12,12 @@ from tgbot.bootstrap import load_settings
 from tgbot.database.managers import TenantManager, UserManager
 from tgbot.keyboards.reply import main_menu, menu_kb
 from tgbot.misc.utils import is_bot_token
+from tgbot.services.bot_identity import BotIdentity, bot_identities
+from tgbot.services.bot_pool import BotPool
+from tgbot.services.cache_bus import TENANT, cache_bus
+from tgbot.services.registry import tenant_registry
 from tgbot.services.tenants import TenantContext
+from tgbot.services.write_behind import write_behind
 
 user_router = Router(name="user_router")
 
@@ -24,22 +29,24 @@ _vault = None
 _tenant_service = None
 
 
-def bootstrap_once():
+async def bootstrap_once():
     global _app_settings, _vault, _tenant_service
     if _app_settings is None:
-        _app_settings, _, _vault, _tenant_service = load_settings()
+        _app_settings, _, _vault, _tenant_service = await load_settings()
     return _app_settings, _vault, _tenant_service
 
 
 async def get_webhook_secret():
-    _, vault, _ = bootstrap_once()
-    secret = vault.read_kv("tgbot/common/webhook_secret")
+    _, vault, _ = await bootstrap_once()
+    secret = await vault.read_kv("tgbot/common/webhook_secret")
     return secret.get("webhook_secret")
 
 
 @user_router.message(CommandStart())
 async def user_start_handler(message: Message):
-    await UserManager(message.from_user.id).create()
+    # batched INSERT ... ON CONFLICT DO NOTHING by the write-behind buffer
+    if not write_behind.add_user(message.from_user.id):
+        await UserManager.create_many([message.from_user.id])
     await message.reply("Добро пожаловать в бот!", reply_markup=main_menu())
 
 
@@ -56,7 +63,7 @@ async def add_bot_handler(message: Message, state: FSMContext):
 
 @user_router.message(StateFilter("add_bot"), F.text.func(is_bot_token))
 async def add_bot_payload(message: Message, state: FSMContext, bot: Bot):
-    app_settings, vault, tenant_service = bootstrap_once()
+    app_settings, vault, tenant_service = await bootstrap_once()
     webhook_secret = await get_webhook_secret()
 
     new_bot = Bot(token=message.text, session=bot.session)
@@ -72,10 +79,17 @@ async def add_bot_payload(message: Message, state: FSMContext, bot: Bot):
         await state.clear()
         return await message.reply("Этот токен уже есть в нашей базе.")
 
-    vault.write_kv(f"tgbot/tenants/{tenant_uid}", {"bot_token": message.text})
+    tenant_registry.put(created)
+    bot_identities.put(
+        tenant_uid, BotIdentity(bot_id=bot_user.id, username=bot_user.username or "")
+    )
+
+    version = await vault.write_kv(
+        f"tgbot/tenants/{tenant_uid}", {"bot_token": message.text}
+    )
 
     tenant_service.put_context(
-        TenantContext(tenant_uid=tenant_uid, bot_token=message.text, version=1)
+        TenantContext(tenant_uid=tenant_uid, bot_token=message.text, version=version)
     )
 
     await new_bot.delete_webhook(drop_pending_updates=True)
@@ -84,7 +98,6 @@ async def add_bot_payload(message: Message, state: FSMContext, bot: Bot):
         + REPLICA_WEBHOOK_PATH.format(tenant_uid=tenant_uid),
         secret_token=webhook_secret,
     )
-    await new_bot.session.close()
 
     await state.clear()
     return await message.answer(f"Бот @{bot_user.username} был успешно добавлен!")
@@ -92,32 +105,20 @@ async def add_bot_payload(message: Message, state: FSMContext, bot: Bot):
 
 @user_router.message(F.text == "Мои боты")
 async def my_bots_menu(message: Message):
-    _, vault, tenant_service = bootstrap_once()
-    tenants = await TenantManager(message.from_user.id).get_all()
-    tenant_uids = [t.uuid for t in tenants]
+    _, _, tenant_service = await bootstrap_once()
+    tenants = await TenantManager(message.from_user.id).get_all() or []
 
-    # Bulk-load contexts (cache first, Vault for misses, limited concurrency)
-    ctx_map = await tenant_service.get_contexts(tenant_uids)
+    # Cached identities; misses fetched concurrently via the shared session.
+    # Revoked tokens are cleaned up by the periodic health sweep, not here.
+    identities = await bot_identities.get_many(
+        [t.uuid for t in tenants], tenant_service, message.bot.session
+    )
 
     kb = []
     for t in tenants:
-        ctx = ctx_map.get(t.uuid)
-        if not ctx:
-            # If something went wrong for a specific tenant, just skip it
-            continue
-        new_bot = Bot(token=ctx.bot_token)
-        try:
-            bot_user = await new_bot.get_me()
-            kb.append(
-                [ib(text=f"@{bot_user.username}", callback_data=f"manage_bot:{t.uuid}")]
-            )
-        except TelegramUnauthorizedError:
-            vault.delete_kv(f"tgbot/tenants/{t.uuid}")
-            tenant_service.invalidate(t.uuid)
-            await TenantManager.delete(t.uuid)
-
-        finally:
-            await new_bot.session.close()
+        identity = identities.get(t.uuid)
+        label = f"@{identity.username}" if identity else (t.name or t.uuid[:8])
+        kb.append([ib(text=label, callback_data=f"manage_bot:{t.uuid}")])
 
     markup = InlineKeyboardMarkup(row_width=1, inline_keyboard=kb)
     await message.reply(
@@ -128,18 +129,16 @@ async def my_bots_menu(message: Message):
 
 @user_router.callback_query(F.data.startswith("manage_bot"))
 async def manage_bot_menu(call: CallbackQuery):
-    _, _, tenant_service = bootstrap_once()
+    _, _, tenant_service = await bootstrap_once()
     tenant_uid = call.data.split(":")[1]
     ctx = await tenant_service.get_context(tenant_uid)
 
-    new_bot = Bot(token=ctx.bot_token)
+    new_bot = Bot(token=ctx.bot_token, session=call.bot.session)
     try:
         bot_user = await new_bot.get_me()
         txt = f"<b>Информация о боте: @{bot_user.username}</b>\n\nСтатус: 🟢 Работает"
     except TelegramUnauthorizedError:
         txt = "У этого бота не работает токен."
-    finally:
-        await new_bot.session.close()
 
     kb = [
         [ib(text="⚠️ Удалить бота", callback_data=f"delete_bot:{tenant_uid}")],
@@ -150,20 +149,24 @@ async def manage_bot_menu(call: CallbackQuery):
 
 
 @user_router.callback_query(F.data.startswith("delete_bot"))
-async def delete_bot_payload(call: CallbackQuery):
-    _, vault, tenant_service = bootstrap_once()
+async def delete_bot_payload(call: CallbackQuery, bot_pool: BotPool | None = None):
+    _, vault, tenant_service = await bootstrap_once()
     tenant_uid = call.data.split(":")[1]
     ctx = await tenant_service.get_context(tenant_uid)
 
-    bot = Bot(token=ctx.bot_token)
+    bot = Bot(token=ctx.bot_token, session=call.bot.session)
     await bot.delete_webhook(drop_pending_updates=True)
-    await bot.session.close()
 
-    vault.delete_kv(f"tgbot/tenants/{tenant_uid}")
+    await vault.delete_kv(f"tgbot/tenants/{tenant_uid}")
 
     tenant_service.invalidate(tenant_uid)
 
     await TenantManager.delete(tenant_uid)
+    tenant_registry.invalidate(tenant_uid)
+    bot_identities.invalidate(tenant_uid)
+    if bot_pool is not None:
+        bot_pool.discard(tenant_uid)
+    cache_bus.publish(TENANT, tenant_uid)
 
     markup = InlineKeyboardMarkup(
         row_width=1, inline_keyboard=[[ib(text="Назад", callback_data="back2bots")]]
@@ -0,0 +1,27 @@
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from aiogram import BaseMiddleware
+from aiogram.types import User
+
+from tgbot.common.logging_setup import log
+from tgbot.services.bans import ban_list
+
+
+class BanCheckMiddleware(BaseMiddleware):
+    """
+    Drop updates from banned users. The check is an in-memory set lookup
+    (ban_list), no DB access per update.
+    """
+
+    async def __call__(
+        self,
+        handler: Callable[[Dict[str, Any], Any], Awaitable[Any]],
+        event: Any,
+        data: Dict[str, Any],
+    ) -> Any:
+        # set by aiogram's UserContextMiddleware for every update type
+        user: Optional[User] = data.get("event_from_user")
+        if user is not None and ban_list.is_banned(user.id):
+            log.debug("banned_user_update_dropped", extra={"user_id": user.id})
+            return None
+        return await handler(event, data)
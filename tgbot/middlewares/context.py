@@ -3,12 +3,14 @@ from typing import Any, Awaitable, Callable, Dict
 from aiogram import BaseMiddleware
 
 from tgbot.common.logging_setup import user_id_var
+from tgbot.database.managers import user_rows_var
 
 
 class ContextLoggingMiddleware(BaseMiddleware):
     """
     Propagate tenant_id (from context var set by request handler) and user_id
     (from incoming update) to logging context used by your JSON logger.
+    Also opens the per-update User row cache used by UserManager.
     """
 
     async def __call__(
@@ -29,4 +31,8 @@ class ContextLoggingMiddleware(BaseMiddleware):
         if uid is not None:
             user_id_var.set(uid)
 
-        return await handler(event, data)
+        rows_token = user_rows_var.set({})
+        try:
+            return await handler(event, data)
+        finally:
+            user_rows_var.reset(rows_token)
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Dict, Set
+
+from tgbot.common.logging_setup import log
+from tgbot.database.managers import UserManager
+from tgbot.database.models import User
+from tgbot.services.cache_bus import BANS, cache_bus
+
+
+class BanList:
+    """
+    In-memory set of banned main bot users (tg_id), so the ban check on
+    every update is a set lookup instead of a DB query:
+    - load() reads all `User.ban` rows; it runs at startup and then every
+      reload interval (run_reloader), which picks up bans written to the DB
+      directly or missed on the cache bus;
+    - ban()/unban() write through UserManager, update the set and tell
+      other replicas over the cache bus (apply() is their handler).
+    """
+
+    def __init__(self) -> None:
+        self._banned: Set[int] = set()
+        # bumped on every change; load() does not overwrite newer changes
+        self._version = 0
+
+    def is_banned(self, tg_id: int) -> bool:
+        return tg_id in self._banned
+
+    async def ban(self, tg_id: int) -> bool:
+        """Ban the user in the DB and in every replica's set."""
+        if not await UserManager(tg_id).ban():
+            return False
+        self._mark(tg_id, True)
+        return True
+
+    async def unban(self, tg_id: int) -> bool:
+        """Lift the ban in the DB and in every replica's set."""
+        if not await UserManager(tg_id).unban():
+            return False
+        self._mark(tg_id, False)
+        return True
+
+    async def load(self) -> int:
+        """Replace the set with banned users from the DB. Returns their count."""
+        version = self._version
+        banned = await User.filter(ban=True).values_list("tg_id", flat=True)
+        if self._version != version:
+            # a ban changed while reading; the next reload catches up
+            return len(self._banned)
+        self._banned = set(banned)
+        return len(self._banned)
+
+    async def run_reloader(self, interval: float) -> None:
+        """Call load() every `interval` seconds until cancelled."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.load()
+            except Exception:
+                log.exception("ban_list_reload_failed")
+
+    def apply(self, key: Any) -> None:
+        """Cache bus handler: `key` is [tg_id, banned] from another replica."""
+        tg_id, banned = key
+        self._set(int(tg_id), bool(banned))
+
+    def stats(self) -> Dict[str, int]:
+        return {"banned": len(self._banned)}
+
+    def _mark(self, tg_id: int, banned: bool) -> None:
+        self._set(tg_id, banned)
+        cache_bus.publish(BANS, [tg_id, banned])
+
+    def _set(self, tg_id: int, banned: bool) -> None:
+        self._version += 1
+        if banned:
+            self._banned.add(tg_id)
+        else:
+            self._banned.discard(tg_id)
+
+
+ban_list = BanList()
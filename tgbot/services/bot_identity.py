@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional
+
+from aiogram import Bot
+from aiogram.client.session.base import BaseSession
+from aiogram.exceptions import TelegramAPIError, TelegramUnauthorizedError
+from cachetools import TTLCache
+
+from tgbot.common.logging_setup import log
+from tgbot.database.managers import TenantManager
+from tgbot.database.models import Tenant
+from tgbot.services.bot_pool import BotPool
+from tgbot.services.cache_bus import TENANT, cache_bus
+from tgbot.services.registry import tenant_registry
+from tgbot.services.tenants import TenantService
+from tgbot.services.vault import VaultClient
+
+
+@dataclass(frozen=True, slots=True)
+class BotIdentity:
+    bot_id: int
+    username: str
+
+
+class BotIdentityService:
+    """
+    Cache of tenant bot identities (tenant_uid -> id/username) for menus:
+    - filled when a bot is added and by the periodic health sweep;
+    - cache misses are fetched with get_me() concurrently (bounded);
+    - token validity is checked only by sweep(), never on menu render.
+    """
+
+    def __init__(
+        self, ttl_seconds: int = 86_400, concurrency: int = 10, maxsize: int = 100_000
+    ) -> None:
+        self.configure(ttl_seconds=ttl_seconds, concurrency=concurrency, maxsize=maxsize)
+
+    def configure(
+        self, *, ttl_seconds: int, concurrency: int, maxsize: int = 100_000
+    ) -> None:
+        self._cache: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl_seconds)
+        self.concurrency = concurrency
+
+    def get_cached(self, tenant_uid: str) -> Optional[BotIdentity]:
+        return self._cache.get(tenant_uid)
+
+    def put(self, tenant_uid: str, identity: BotIdentity) -> None:
+        self._cache[tenant_uid] = identity
+
+    def invalidate(self, tenant_uid: str) -> None:
+        self._cache.pop(tenant_uid, None)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    async def get_many(
+        self,
+        tenant_uids: Iterable[str],
+        tenant_service: TenantService,
+        session: BaseSession,
+    ) -> Dict[str, BotIdentity]:
+        """
+        Return identities for the given tenants: cached ones immediately,
+        misses via concurrent get_me(). Tenants that fail are left out.
+        """
+        result: Dict[str, BotIdentity] = {}
+        misses = []
+        for uid in tenant_uids:
+            identity = self.get_cached(uid)
+            if identity is not None:
+                result[uid] = identity
+            else:
+                misses.append(uid)
+        if not misses:
+            return result
+
+        ctx_map = await tenant_service.get_contexts(misses)
+        sem = asyncio.Semaphore(self.concurrency)
+
+        async def fetch_one(uid: str) -> None:
+            async with sem:
+                try:
+                    identity = await self._fetch(ctx_map[uid].bot_token, session)
+                except TelegramAPIError:
+                    log.warning("bot_identity_fetch_failed", extra={"tenant_uid": uid})
+                    return
+            self.put(uid, identity)
+            result[uid] = identity
+
+        await asyncio.gather(*(fetch_one(uid) for uid in misses if uid in ctx_map))
+        return result
+
+    async def sweep(
+        self,
+        tenant_service: TenantService,
+        vault: VaultClient,
+        session: BaseSession,
+        bots: Optional[BotPool] = None,
+    ) -> None:
+        """
+        Health sweep over all active tenants: refresh identities and remove
+        tenants whose token was revoked (Vault secret, DB row, caches and
+        the pooled Bot in `bots`).
+        """
+        tenant_uids = await Tenant.filter(is_active=True).values_list("uuid", flat=True)
+        sem = asyncio.Semaphore(self.concurrency)
+        removed = 0
+
+        async def check_one(uid: str) -> None:
+            nonlocal removed
+            async with sem:
+                try:
+                    ctx = await tenant_service.get_context(uid)
+                    identity = await self._fetch(ctx.bot_token, session)
+                except TelegramUnauthorizedError:
+                    await vault.delete_kv(f"tgbot/tenants/{uid}")
+                    tenant_service.invalidate(uid)
+                    await TenantManager.delete(uid)
+                    tenant_registry.invalidate(uid)
+                    self.invalidate(uid)
+                    if bots is not None:
+                        bots.discard(uid)
+                    cache_bus.publish(TENANT, uid)
+                    removed += 1
+                    log.warning("tenant_token_revoked", extra={"tenant_uid": uid})
+                    return
+                except Exception:
+                    log.exception("bot_health_check_failed", extra={"tenant_uid": uid})
+                    return
+            self.put(uid, identity)
+
+        await asyncio.gather(*(check_one(uid) for uid in tenant_uids))
+        log.info(
+            "bot_health_sweep_done",
+            extra={"checked": len(tenant_uids), "removed": removed},
+        )
+
+    async def run_sweeps(
+        self,
+        tenant_service: TenantService,
+        vault: VaultClient,
+        session: BaseSession,
+        *,
+        interval: float,
+        bots: Optional[BotPool] = None,
+    ) -> None:
+        """Run sweep() every `interval` seconds until cancelled."""
+        while True:
+            try:
+                await self.sweep(tenant_service, vault, session, bots)
+            except Exception:
+                log.exception("bot_health_sweep_failed")
+            await asyncio.sleep(interval)
+
+    @staticmethod
+    async def _fetch(token: str, session: BaseSession) -> BotIdentity:
+        me = await Bot(token=token, session=session).get_me()
+        return BotIdentity(bot_id=me.id, username=me.username or "")
+
+
+# Filled by the add-bot flow and the health sweep, read by the "my bots" menus
+bot_identities = BotIdentityService()
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Dict, Iterator, Optional, Tuple
+
+from aiogram import Bot
+from aiogram.client.session.base import BaseSession
+
+from tgbot.common.logging_setup import log
+
+
+class BotPool:
+    """
+    Bounded pool of tenant Bot instances (tenant_uid -> Bot):
+    - LRU eviction when more than `max_size` bots are held;
+    - bots idle for longer than `idle_seconds` are evicted lazily on access;
+    - evicted sessions are closed in the background after `close_delay`
+      seconds, so updates still being processed with that bot can finish;
+      bots using `shared_session` are just dropped (the owner closes it);
+    - hits/misses/evictions counters via stats().
+    """
+
+    def __init__(
+        self,
+        max_size: int = 1000,
+        idle_seconds: float = 3600,
+        close_delay: float = 30,
+        shared_session: Optional[BaseSession] = None,
+    ) -> None:
+        self.max_size = max_size
+        self.idle_seconds = idle_seconds
+        self.close_delay = close_delay
+        self.shared_session = shared_session
+        # LRU order: least recently used first
+        self._bots: "OrderedDict[str, Tuple[Bot, float]]" = OrderedDict()
+        # delayed closes: task -> bot it will close
+        self._closing: Dict[asyncio.Task, Bot] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, uid: str) -> Optional[Bot]:
+        self._evict_idle()
+        item = self._bots.get(uid)
+        if item is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        bot = item[0]
+        self._bots[uid] = (bot, time.monotonic())
+        self._bots.move_to_end(uid)
+        return bot
+
+    def put(self, uid: str, bot: Bot) -> None:
+        old = self._bots.pop(uid, None)
+        if old is not None and old[0] is not bot:
+            self._close_later(old[0])
+        self._bots[uid] = (bot, time.monotonic())
+        while len(self._bots) > self.max_size:
+            evicted_uid, (evicted, _) = self._bots.popitem(last=False)
+            self._evict(evicted_uid, evicted, reason="lru")
+
+    def discard(self, uid: str) -> None:
+        """Drop tenant bot (e.g. token rotated or tenant deleted)."""
+        item = self._bots.pop(uid, None)
+        if item is not None:
+            self._close_later(item[0])
+
+    def values(self) -> Iterator[Bot]:
+        return (bot for bot, _ in self._bots.values())
+
+    def __len__(self) -> int:
+        return len(self._bots)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._bots),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    async def close(self) -> None:
+        """Close all pooled and pending-close sessions (shutdown)."""
+        bots = list(self.values()) + list(self._closing.values())
+        self._bots.clear()
+        pending = list(self._closing)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        for bot in bots:
+            if bot.session is not self.shared_session:
+                await bot.session.close()
+
+    def _evict_idle(self) -> None:
+        if not self._bots:
+            return
+        deadline = time.monotonic() - self.idle_seconds
+        while self._bots:
+            uid, (bot, last_used) = next(iter(self._bots.items()))
+            if last_used > deadline:
+                break
+            del self._bots[uid]
+            self._evict(uid, bot, reason="idle")
+
+    def _evict(self, uid: str, bot: Bot, *, reason: str) -> None:
+        self.evictions += 1
+        log.info("bot_evicted", extra={"tenant_uid": uid, "reason": reason})
+        self._close_later(bot)
+
+    def _close_later(self, bot: Bot) -> None:
+        if bot.session is self.shared_session:
+            return
+        task = asyncio.create_task(self._close_after_delay(bot))
+        self._closing[task] = bot
+        task.add_done_callback(lambda t: self._closing.pop(t, None))
+
+    async def _close_after_delay(self, bot: Bot) -> None:
+        await asyncio.sleep(self.close_delay)
+        await bot.session.close()
@@ -0,0 +1,428 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from aiogram import Bot
+from aiogram.client.session.base import BaseSession
+from aiogram.exceptions import (
+    TelegramBadRequest,
+    TelegramForbiddenError,
+    TelegramNetworkError,
+    TelegramRetryAfter,
+)
+
+from tortoise.expressions import Subquery
+from tortoise.transactions import in_transaction
+
+from tgbot.common.logging_setup import log
+from tgbot.database.models import Broadcast, Tenant, TenantUser
+from tgbot.services.tenants import TenantService
+
+
+class RateLimiter:
+    """
+    Spaces out calls to at most `rate` per second (shared by all senders).
+    pause() pushes the next slot forward, e.g. on TelegramRetryAfter.
+    """
+
+    def __init__(self, rate: float) -> None:
+        self._interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            now = loop.time()
+            wait = self._next - now
+            if wait > 0:
+                await asyncio.sleep(wait)
+                now = loop.time()
+            self._next = max(now, self._next) + self._interval
+
+    def pause(self, seconds: float) -> None:
+        now = asyncio.get_running_loop().time()
+        self._next = max(self._next, now + seconds)
+
+
+class BroadcastEngine:
+    """
+    Runs tenant mailings as jobs queued in the `tenant_broadcast` table.
+    The webhook process only enqueue()s; a worker process (worker.py) claims
+    jobs with claim_next() and runs them via serve():
+    - recipients are streamed from DB in pages ordered by TenantUser.id;
+    - each page is sent with bounded concurrency under a per-bot rate limit,
+      honouring TelegramRetryAfter; all jobs of one tenant in this process
+      share that tenant's RateLimiter;
+    - progress (cursor, sent, failed) is saved after every page, so a restart
+      resumes from the last saved page (that page may be re-sent);
+    - updated_at acts as a lease, refreshed by a heartbeat every
+      `lease_seconds / 3` while the job runs: a running job not touched for
+      `lease_seconds` (dead worker) is claimed again;
+    - a job whose tenant token can't be loaded is retried with exponential
+      backoff (per worker) and fails after `token_attempts` tries;
+    - live counters are reported by editing the admin's progress message.
+    """
+
+    def __init__(
+        self,
+        *,
+        concurrency: int = 10,
+        rate_per_second: float = 25,
+        page_size: int = 500,
+        progress_interval_seconds: float = 5,
+        max_retries: int = 3,
+        max_jobs: int = 4,
+        lease_seconds: int = 120,
+        token_attempts: int = 5,
+        token_backoff_seconds: float = 30,
+    ) -> None:
+        self.configure(
+            concurrency=concurrency,
+            rate_per_second=rate_per_second,
+            page_size=page_size,
+            progress_interval_seconds=progress_interval_seconds,
+            max_retries=max_retries,
+            max_jobs=max_jobs,
+            lease_seconds=lease_seconds,
+            token_attempts=token_attempts,
+            token_backoff_seconds=token_backoff_seconds,
+        )
+        self._tasks: Dict[int, asyncio.Task] = {}
+        # tenant_id -> limiter shared by that tenant's running jobs
+        self._limiters: Dict[int, RateLimiter] = {}
+        self._limiter_users: Counter[int] = Counter()
+        # job id -> (failed token loads, monotonic time of the next try)
+        self._backoff: Dict[int, Tuple[int, float]] = {}
+
+    def configure(
+        self,
+        *,
+        concurrency: int,
+        rate_per_second: float,
+        page_size: int,
+        progress_interval_seconds: float,
+        max_retries: int = 3,
+        max_jobs: int = 4,
+        lease_seconds: int = 120,
+        token_attempts: int = 5,
+        token_backoff_seconds: float = 30,
+    ) -> None:
+        self.concurrency = concurrency
+        self.rate_per_second = rate_per_second
+        self.page_size = page_size
+        self.progress_interval_seconds = progress_interval_seconds
+        self.max_retries = max_retries
+        self.max_jobs = max_jobs
+        self.lease_seconds = lease_seconds
+        self.token_attempts = token_attempts
+        self.token_backoff_seconds = token_backoff_seconds
+
+    async def enqueue(
+        self, bot: Bot, tenant_id: int, from_chat_id: int, message_id: int
+    ) -> Broadcast:
+        """Queue a job for copying `message_id` to all tenant users."""
+        progress = await bot.send_message(
+            from_chat_id, "Рассылка поставлена в очередь..."
+        )
+        return await Broadcast.create(
+            tenant_id=tenant_id,
+            from_chat_id=from_chat_id,
+            message_id=message_id,
+            progress_message_id=progress.message_id,
+        )
+
+    def start(self, bot: Bot, job: Broadcast, *, close_bot: bool = False) -> asyncio.Task:
+        """Run job in a background task. `close_bot` closes bot session when done."""
+        task = asyncio.create_task(self._run_guarded(bot, job, close_bot=close_bot))
+        self._tasks[job.id] = task
+        task.add_done_callback(lambda _t, job_id=job.id: self._tasks.pop(job_id, None))
+        return task
+
+    async def stop(self) -> None:
+        """Cancel running jobs; they go back to the queue with their saved cursor."""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            with contextlib.suppress(BaseException):
+                await task
+
+    async def _run_guarded(self, bot: Bot, job: Broadcast, *, close_bot: bool) -> None:
+        try:
+            await self.run(bot, job)
+        except asyncio.CancelledError:
+            log.info(
+                "broadcast_interrupted",
+                extra={"broadcast_id": job.id, "cursor": job.cursor},
+            )
+            # hand the job back immediately instead of waiting for lease expiry
+            job.status = Broadcast.STATUS_PENDING
+            with contextlib.suppress(Exception):
+                await asyncio.shield(job.save(update_fields=["status", "updated_at"]))
+            raise
+        except Exception:
+            log.exception("broadcast_failed", extra={"broadcast_id": job.id})
+            job.status = Broadcast.STATUS_FAILED
+            with contextlib.suppress(Exception):
+                await job.save(update_fields=["status", "updated_at"])
+                await self._report(bot, job)
+        finally:
+            if close_bot:
+                await bot.session.close()
+
+    async def run(self, bot: Bot, job: Broadcast) -> None:
+        """Send the job to all remaining recipients (after job.cursor)."""
+        sem = asyncio.Semaphore(self.concurrency)
+
+        job.status = Broadcast.STATUS_RUNNING
+        await job.save(update_fields=["status", "updated_at"])
+        log.info("broadcast_started", extra={"broadcast_id": job.id, "cursor": job.cursor})
+
+        limiter = self._acquire_limiter(job.tenant_id)
+        heartbeat = asyncio.create_task(self._heartbeat(job))
+        try:
+            await self._send_pages(bot, job, limiter, sem)
+        finally:
+            heartbeat.cancel()
+            with contextlib.suppress(BaseException):
+                await heartbeat
+            self._release_limiter(job.tenant_id)
+
+        job.status = Broadcast.STATUS_DONE
+        await job.save(update_fields=["status", "updated_at"])
+        await self._report(bot, job)
+        log.info(
+            "broadcast_done",
+            extra={"broadcast_id": job.id, "sent": job.sent, "failed": job.failed},
+        )
+
+    def _acquire_limiter(self, tenant_id: int) -> RateLimiter:
+        limiter = self._limiters.get(tenant_id)
+        if limiter is None:
+            limiter = self._limiters[tenant_id] = RateLimiter(self.rate_per_second)
+        self._limiter_users[tenant_id] += 1
+        return limiter
+
+    def _release_limiter(self, tenant_id: int) -> None:
+        self._limiter_users[tenant_id] -= 1
+        if self._limiter_users[tenant_id] <= 0:
+            del self._limiter_users[tenant_id]
+            self._limiters.pop(tenant_id, None)
+
+    async def _send_pages(
+        self, bot: Bot, job: Broadcast, limiter: RateLimiter, sem: asyncio.Semaphore
+    ) -> None:
+        loop = asyncio.get_running_loop()
+        last_report = 0.0
+        while True:
+            page: List[Tuple[int, int]] = await (
+                TenantUser.filter(tenant_id=job.tenant_id, id__gt=job.cursor)
+                .order_by("id")
+                .limit(self.page_size)
+                .values_list("id", "tg_id")
+            )
+            if not page:
+                break
+
+            async def send(chat_id: int) -> bool:
+                async with sem:
+                    return await self._send_one(bot, job, chat_id, limiter)
+
+            results = await asyncio.gather(*(send(tg_id) for _, tg_id in page))
+            job.sent += sum(1 for ok in results if ok)
+            job.failed += sum(1 for ok in results if not ok)
+            job.cursor = page[-1][0]
+            await job.save(update_fields=["cursor", "sent", "failed", "updated_at"])
+
+            if loop.time() - last_report >= self.progress_interval_seconds:
+                last_report = loop.time()
+                await self._report(bot, job)
+
+    async def _heartbeat(self, job: Broadcast) -> None:
+        """Keep the lease of a running job while a page is still being sent."""
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                await Broadcast.filter(id=job.id, status=Broadcast.STATUS_RUNNING).update(
+                    updated_at=datetime.now(timezone.utc)
+                )
+            except Exception:
+                log.warning("broadcast_heartbeat_failed", extra={"broadcast_id": job.id})
+
+    async def _send_one(
+        self, bot: Bot, job: Broadcast, chat_id: int, limiter: RateLimiter
+    ) -> bool:
+        for _ in range(self.max_retries + 1):
+            await limiter.acquire()
+            try:
+                await bot.copy_message(
+                    chat_id=chat_id,
+                    from_chat_id=job.from_chat_id,
+                    message_id=job.message_id,
+                )
+                return True
+            except TelegramRetryAfter as e:
+                # Flood control is per bot: slow down every sender
+                limiter.pause(e.retry_after)
+            except TelegramNetworkError:
+                limiter.pause(1)
+            except (TelegramForbiddenError, TelegramBadRequest):
+                return False
+        return False
+
+    async def _report(self, bot: Bot, job: Broadcast) -> None:
+        if job.progress_message_id is None:
+            return
+        if job.status == Broadcast.STATUS_DONE:
+            head = "Рассылка завершена."
+        elif job.status == Broadcast.STATUS_FAILED:
+            head = "Рассылка прервана из-за ошибки."
+        else:
+            head = "Рассылка выполняется..."
+        text = f"{head} Отправлено: {job.sent}. Ошибок: {job.failed}."
+        # "message is not modified" and similar are not worth failing the job
+        with contextlib.suppress(TelegramBadRequest, TelegramForbiddenError):
+            await bot.edit_message_text(
+                text, chat_id=job.from_chat_id, message_id=job.progress_message_id
+            )
+
+    async def claim_next(self) -> Optional[Broadcast]:
+        """
+        Atomically take the oldest pending job (or a running job whose lease
+        expired). Safe with several workers: the conditional UPDATE wins once.
+        At most one job per tenant runs at a time, across all workers, so the
+        per-bot rate limit holds: claims lock the tenant row and skip tenants
+        with another running job.
+        """
+        now = datetime.now(timezone.utc)
+        stale = now - timedelta(seconds=self.lease_seconds)
+        backing_off = [
+            job_id
+            for job_id, (_attempts, retry_at) in self._backoff.items()
+            if retry_at > time.monotonic()
+        ]
+        busy_tenants = Subquery(
+            Broadcast.filter(status=Broadcast.STATUS_RUNNING).values("tenant_id")
+        )
+        pending = Broadcast.filter(status=Broadcast.STATUS_PENDING).exclude(
+            tenant_id__in=busy_tenants
+        )
+        if backing_off:
+            pending = pending.exclude(id__in=backing_off)
+        candidates = await pending.order_by("id").limit(self.max_jobs)
+        candidates += await (
+            Broadcast.filter(status=Broadcast.STATUS_RUNNING, updated_at__lt=stale)
+            .order_by("id")
+            .limit(self.max_jobs)
+        )
+        for job in candidates:
+            if job.id in self._tasks:
+                continue
+            if await self._try_claim(job, now, stale):
+                job.status = Broadcast.STATUS_RUNNING
+                job.updated_at = now
+                return job
+        return None
+
+    @staticmethod
+    async def _try_claim(job: Broadcast, now: datetime, stale: datetime) -> bool:
+        async with in_transaction() as conn:
+            # serializes claims of one tenant's jobs between workers
+            await (
+                Tenant.filter(numeric_id=job.tenant_id)
+                .select_for_update()
+                .using_db(conn)
+                .first()
+            )
+            others = Broadcast.filter(
+                tenant_id=job.tenant_id, status=Broadcast.STATUS_RUNNING
+            ).exclude(id=job.id)
+            if job.status == Broadcast.STATUS_RUNNING:
+                # an expired lease does not block the other expired jobs
+                others = others.filter(updated_at__gte=stale)
+            if await others.using_db(conn).exists():
+                return False
+            query = Broadcast.filter(id=job.id, status=job.status)
+            if job.status == Broadcast.STATUS_RUNNING:
+                query = query.filter(updated_at__lt=stale)
+            claimed = await query.using_db(conn).update(
+                status=Broadcast.STATUS_RUNNING, updated_at=now
+            )
+        return bool(claimed)
+
+    async def serve(
+        self,
+        tenant_service: TenantService,
+        *,
+        bot_settings: Dict[str, Any] | None = None,
+        session: Optional[BaseSession] = None,
+        poll_interval: float = 2,
+    ) -> None:
+        """
+        Worker loop: keep up to max_jobs jobs running until cancelled.
+        With a shared `session` job bots reuse it and leave it open.
+        """
+        log.info("broadcast_worker_started", extra={"max_jobs": self.max_jobs})
+        if session is not None:
+            bot_settings = {**(bot_settings or {}), "session": session}
+        try:
+            while True:
+                while len(self._tasks) < self.max_jobs:
+                    job = await self.claim_next()
+                    if job is None:
+                        break
+                    bot = await self._bot_for(job, tenant_service, bot_settings)
+                    if bot is None:
+                        break  # retry on next poll
+                    self.start(bot, job, close_bot=session is None)
+                await asyncio.sleep(poll_interval)
+        finally:
+            await self.stop()
+
+    async def _bot_for(
+        self,
+        job: Broadcast,
+        tenant_service: TenantService,
+        bot_settings: Dict[str, Any] | None,
+    ) -> Optional[Bot]:
+        """
+        Build tenant Bot for a claimed job. The job fails if the tenant is
+        gone; if its token can't be loaded now it goes back to the queue and
+        is not claimed again until its backoff passes, failing for good
+        after `token_attempts` tries.
+        """
+        tenant = await Tenant.get_or_none(numeric_id=job.tenant_id)
+        if tenant is None or not tenant.is_active:
+            log.warning("broadcast_tenant_missing", extra={"broadcast_id": job.id})
+            job.status = Broadcast.STATUS_FAILED
+            await job.save(update_fields=["status", "updated_at"])
+            return None
+        try:
+            ctx = await tenant_service.get_context(tenant.uuid)
+        except Exception:
+            attempts = self._backoff.get(job.id, (0, 0.0))[0] + 1
+            log.exception(
+                "broadcast_token_unavailable",
+                extra={"broadcast_id": job.id, "attempts": attempts},
+            )
+            if attempts >= self.token_attempts:
+                self._backoff.pop(job.id, None)
+                job.status = Broadcast.STATUS_FAILED
+            else:
+                delay = self.token_backoff_seconds * 2 ** (attempts - 1)
+                self._backoff[job.id] = (attempts, time.monotonic() + delay)
+                job.status = Broadcast.STATUS_PENDING
+            await job.save(update_fields=["status", "updated_at"])
+            return None
+        self._backoff.pop(job.id, None)
+        return Bot(token=ctx.bot_token, **(bot_settings or {}))
+
+
+# bot.py only enqueue()s jobs, worker.py serve()s them
+broadcast_engine = BroadcastEngine()
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import uuid
+from collections import defaultdict
+from typing import Any, Callable, DefaultDict, List, Optional, Set
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from tgbot.common.logging_setup import log
+
+# Invalidation kinds and their keys
+TENANT = "tenant"  # tenant_uid: registry, Vault context, bot identity
+LOCALES = "locales"  # tenant_id: locale texts
+SETTINGS = "settings"  # tenant_id: subscription settings
+BANS = "bans"  # [tg_id, banned]: banned main bot users
+
+CHANNEL = "tgbot:cache:invalidate"
+
+
+class CacheBus:
+    """
+    Cross-replica invalidation for the in-process caches (tenant registry,
+    tenant contexts, locales, settings) over Redis pub/sub:
+    - a replica that changes data updates its own caches as before and
+      calls publish(kind, key);
+    - every other replica drops that key via handlers registered with on(),
+      the next read goes to DB/Vault;
+    - messages published while the listener was disconnected are lost, so
+      after re-subscribing it runs the on_resync() callbacks (drop whole
+      caches) instead.
+    Without Redis (single replica) publish() is a no-op.
+    """
+
+    def __init__(self) -> None:
+        self._redis: Optional[Redis] = None
+        self._handlers: DefaultDict[str, List[Callable[[Any], None]]] = defaultdict(list)
+        self._resync: List[Callable[[], None]] = []
+        self._origin = uuid.uuid4().hex
+        self._listener: Optional[asyncio.Task] = None
+        self._pending: Set[asyncio.Task] = set()
+
+    def on(self, kind: str, handler: Callable[[Any], None]) -> None:
+        """Call `handler(key)` when another replica invalidates `kind`."""
+        self._handlers[kind].append(handler)
+
+    def on_resync(self, callback: Callable[[], None]) -> None:
+        """Call `callback()` after the listener reconnects (messages may be lost)."""
+        self._resync.append(callback)
+
+    async def start(self, redis: Redis) -> None:
+        """Subscribe to the invalidation channel (connection owned by caller)."""
+        self._redis = redis
+        self._listener = asyncio.create_task(self._listen())
+
+    def publish(self, kind: str, key: Any) -> None:
+        """Tell other replicas to drop `key` of `kind` (fire-and-forget)."""
+        if self._redis is None:
+            return
+        message = json.dumps({"origin": self._origin, "kind": kind, "key": key})
+        task = asyncio.create_task(self._redis.publish(CHANNEL, message))
+        self._pending.add(task)
+        task.add_done_callback(self._on_published)
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            with contextlib.suppress(BaseException):
+                await self._listener
+            self._listener = None
+        if self._pending:
+            await asyncio.wait(set(self._pending), timeout=5)
+        self._redis = None
+
+    def _on_published(self, task: asyncio.Task) -> None:
+        self._pending.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            log.warning("cache_invalidation_publish_failed", exc_info=task.exception())
+
+    async def _listen(self) -> None:
+        reconnecting = False
+        while True:
+            pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(CHANNEL)
+                if reconnecting:
+                    reconnecting = False
+                    self._run_resync()
+                async for message in pubsub.listen():
+                    self._dispatch(message.get("data"))
+            except RedisError:
+                log.exception("cache_bus_disconnected")
+                reconnecting = True
+                await asyncio.sleep(1)
+            finally:
+                with contextlib.suppress(Exception):
+                    await pubsub.aclose()
+
+    def _run_resync(self) -> None:
+        log.info("cache_bus_resync", extra={"callbacks": len(self._resync)})
+        for callback in self._resync:
+            try:
+                callback()
+            except Exception:
+                log.exception("cache_resync_failed")
+
+    def _dispatch(self, raw: Any) -> None:
+        try:
+            data = json.loads(raw)
+        except (TypeError, ValueError):
+            log.warning("cache_invalidation_malformed")
+            return
+        if data.get("origin") == self._origin:
+            return
+        kind, key = data.get("kind"), data.get("key")
+        for handler in self._handlers.get(kind, ()):
+            try:
+                handler(key)
+            except Exception:
+                log.exception("cache_invalidation_failed", extra={"kind": kind})
+
+
+cache_bus = CacheBus()
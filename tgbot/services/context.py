@@ -1,21 +1,39 @@
 from __future__ import annotations
 
+import contextvars
+from typing import Optional
+
 from tgbot.common.logging_setup import tenant_id_var
 from tgbot.common.logging_setup import log
-from tgbot.database.managers import TenantManager
 from tgbot.database.models import Tenant
+from tgbot.services.registry import tenant_registry
+
+# Tenant model resolved for the update being processed (request-scoped).
+# Set by the webhook handler in resolve_bot, copied into background tasks.
+current_tenant_var: contextvars.ContextVar[Optional[Tenant]] = contextvars.ContextVar(
+    "current_tenant", default=None
+)
 
 
 async def get_current_tenant() -> Tenant:
-    """Resolve the current tenant using the context variable set by webhook handler."""
+    """
+    Resolve the current tenant for the update being processed.
+    Reuses the tenant resolved by the webhook handler; otherwise looks it up
+    once by the tenant_id context var and keeps it for the rest of the update.
+    """
+
+    tenant = current_tenant_var.get()
+    if tenant is not None:
+        return tenant
 
     tenant_uid = tenant_id_var.get()
     if not tenant_uid or tenant_uid == "-":
         raise LookupError("Tenant context is not available")
 
-    tenant = await TenantManager.get_by_uid(tenant_uid)
+    tenant = await tenant_registry.get(tenant_uid)
     if tenant is None:
         log.warning("tenant_missing", extra={"tenant_uid": tenant_uid})
         raise LookupError(f"Tenant with uid '{tenant_uid}' was not found")
 
+    current_tenant_var.set(tenant)
     return tenant
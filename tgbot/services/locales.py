@@ -1,8 +1,11 @@
 from __future__ import annotations
 
-from typing import Dict, Iterable
+from typing import Dict, Iterable, List, Tuple
+
+from cachetools import TTLCache
 
 from tgbot.database.models import TenantLocale
+from tgbot.services.cache_bus import LOCALES, cache_bus
 
 START_MESSAGE_KEY = "start-message"
 FIRST_BUTTON_KEY = "first-button"
@@ -41,31 +44,151 @@ DEFAULT_LOCALES: Dict[str, Dict[str, str]] = {
 }
 
 
+class _TenantLocales:
+    """Cached locales of a single tenant: (lang, key) -> TenantLocale."""
+
+    __slots__ = ("version", "items")
+
+    def __init__(self) -> None:
+        self.version = 0
+        self.items: Dict[Tuple[str, str], TenantLocale] = {}
+
+
+class LocaleCache:
+    """
+    In-memory cache of tenant locales keyed by tenant -> (lang, key):
+    - LRU eviction by tenant (bounded number of tenants kept in memory);
+      a tenant's locales are also dropped `ttl_seconds` after first load,
+      a fallback for edits this process was not told about.
+    - Write-through: writers put() the saved row, readers never see stale text.
+    - Per-tenant version guards against a slow reader overwriting a newer
+      write with rows it fetched before that write (see fill()).
+    - hits/misses counters for observability.
+    """
+
+    def __init__(self, max_tenants: int = 10_000, ttl_seconds: int = 600) -> None:
+        self.configure(max_tenants=max_tenants, ttl_seconds=ttl_seconds)
+
+    def configure(self, *, max_tenants: int, ttl_seconds: int = 600) -> None:
+        self._tenants: TTLCache = TTLCache(maxsize=max_tenants, ttl=ttl_seconds)
+        self.hits = 0
+        self.misses = 0
+
+    def version(self, tenant_id: int) -> int:
+        bucket = self._tenants.get(tenant_id)
+        return bucket.version if bucket is not None else 0
+
+    def get_many(
+        self, tenant_id: int, lang: str, keys: Iterable[str]
+    ) -> Tuple[Dict[str, TenantLocale], List[str]]:
+        """Return (cached locales, missing keys) and update hit/miss counters."""
+        bucket = self._tenants.get(tenant_id)
+        found: Dict[str, TenantLocale] = {}
+        missing: List[str] = []
+        for key in keys:
+            locale = bucket.items.get((lang, key)) if bucket is not None else None
+            if locale is None:
+                missing.append(key)
+            else:
+                found[key] = locale
+        self.hits += len(found)
+        self.misses += len(missing)
+        return found, missing
+
+    def fill(self, tenant_id: int, locales: Iterable[TenantLocale], version: int) -> None:
+        """Store rows read from DB unless a write happened since `version`."""
+        if self.version(tenant_id) != version:
+            return
+        bucket = self._bucket(tenant_id)
+        for locale in locales:
+            bucket.items.setdefault((locale.lang, locale.type), locale)
+
+    def put(self, locale: TenantLocale) -> None:
+        """Write-through after a successful save; bumps tenant version."""
+        bucket = self._bucket(locale.tenant_id)
+        bucket.version += 1
+        bucket.items[(locale.lang, locale.type)] = locale
+
+    def invalidate(self, tenant_id: int) -> None:
+        self._tenants.pop(tenant_id, None)
+
+    def clear(self) -> None:
+        self._tenants.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "tenants": len(self._tenants),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def _bucket(self, tenant_id: int) -> _TenantLocales:
+        bucket = self._tenants.get(tenant_id)
+        if bucket is None:
+            bucket = _TenantLocales()
+            self._tenants[tenant_id] = bucket
+        return bucket
+
+
+# Default cache of TenantLocaleService; other replicas' edits arrive via cache_bus
+locale_cache = LocaleCache()
+
+
 class TenantLocaleService:
     """Service for reading and mutating tenant-specific locales."""
 
-    def __init__(self, tenant_id: int, lang: str = "ru") -> None:
+    def __init__(
+        self, tenant_id: int, lang: str = "ru", cache: LocaleCache | None = None
+    ) -> None:
         self.tenant_id = tenant_id
         self.lang = lang
+        self.cache = cache or locale_cache
 
     async def get_locale(self, key: str) -> TenantLocale:
+        locales = await self.get_locales((key,))
+        return locales[key]
+
+    async def get_locales(self, keys: Iterable[str]) -> Dict[str, TenantLocale]:
+        """
+        Serve requested locales from cache; fetch misses with a single IN query.
+        Missing rows are seeded from DEFAULT_LOCALES with one bulk insert.
+        """
+        keys = list(dict.fromkeys(keys))
+        found, to_fetch = self.cache.get_many(self.tenant_id, self.lang, keys)
+        if not to_fetch:
+            return found
+
+        version = self.cache.version(self.tenant_id)
+        rows = await TenantLocale.filter(
+            tenant_id=self.tenant_id, lang=self.lang, type__in=to_fetch
+        )
+        found.update({locale.type: locale for locale in rows})
+
+        missing = [key for key in to_fetch if key not in found]
+        if missing:
+            await TenantLocale.bulk_create(
+                [self._default_locale(key) for key in missing],
+                ignore_conflicts=True,  # concurrent first render may seed too
+            )
+            rows = await TenantLocale.filter(
+                tenant_id=self.tenant_id, lang=self.lang, type__in=missing
+            )
+            found.update({locale.type: locale for locale in rows})
+
+        self.cache.fill(
+            self.tenant_id, (found[key] for key in to_fetch), version=version
+        )
+        return {key: found[key] for key in keys}
+
+    def _default_locale(self, key: str) -> TenantLocale:
         defaults = DEFAULT_LOCALES.get(key, {"name": key, "text": ""})
-        locale, _ = await TenantLocale.get_or_create(
+        return TenantLocale(
             tenant_id=self.tenant_id,
             type=key,
             lang=self.lang,
-            defaults={
-                "name": defaults.get("name", key),
-                "text": defaults.get("text", ""),
-            },
+            name=defaults.get("name", key),
+            text=defaults.get("text", ""),
         )
-        return locale
-
-    async def get_locales(self, keys: Iterable[str]) -> Dict[str, TenantLocale]:
-        result: Dict[str, TenantLocale] = {}
-        for key in keys:
-            result[key] = await self.get_locale(key)
-        return result
 
     async def update_locale(
         self,
@@ -79,5 +202,12 @@ class TenantLocaleService:
             locale.name = name
         if text is not None:
             locale.text = text
-        await locale.save()
+        try:
+            await locale.save()
+        except Exception:
+            # cached instance was mutated in place; drop it to re-read from DB
+            self.cache.invalidate(self.tenant_id)
+            raise
+        self.cache.put(locale)
+        cache_bus.publish(LOCALES, self.tenant_id)
         return locale
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from typing import Optional, Tuple
+
+from cachetools import TTLCache
+
+MembershipKey = Tuple[int, str, int]  # (tenant_id, channel, user_id)
+
+
+class MembershipCache:
+    """
+    Short-lived cache of channel membership checks (get_chat_member results).
+    Positive results are kept longer than negative ones, so a user who has
+    just subscribed is re-checked soon, while members skip the API call.
+    """
+
+    def __init__(
+        self,
+        positive_ttl_seconds: int = 300,
+        negative_ttl_seconds: int = 15,
+        maxsize: int = 100_000,
+    ) -> None:
+        self.configure(
+            positive_ttl_seconds=positive_ttl_seconds,
+            negative_ttl_seconds=negative_ttl_seconds,
+            maxsize=maxsize,
+        )
+
+    def configure(
+        self,
+        *,
+        positive_ttl_seconds: int,
+        negative_ttl_seconds: int,
+        maxsize: int = 100_000,
+    ) -> None:
+        self._positive: TTLCache = TTLCache(maxsize=maxsize, ttl=positive_ttl_seconds)
+        self._negative: TTLCache = TTLCache(maxsize=maxsize, ttl=negative_ttl_seconds)
+
+    def get(self, tenant_id: int, channel: str, user_id: int) -> Optional[bool]:
+        """Return cached membership or None when unknown/expired."""
+        key = (tenant_id, channel, user_id)
+        if key in self._positive:
+            return True
+        if key in self._negative:
+            return False
+        return None
+
+    def put(self, tenant_id: int, channel: str, user_id: int, is_member: bool) -> None:
+        key = (tenant_id, channel, user_id)
+        if is_member:
+            self._positive[key] = True
+            self._negative.pop(key, None)
+        else:
+            self._negative[key] = True
+            self._positive.pop(key, None)
+
+
+membership_cache = MembershipCache()
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Optional
+
+from cachetools import TTLCache
+
+from tgbot.common.logging_setup import log
+from tgbot.database.managers import TenantManager
+from tgbot.database.models import Tenant
+
+
+class TenantRegistry:
+    """
+    In-memory registry of tenants keyed by webhook UID:
+    - Bulk-loaded once from the `tenants` table at startup.
+    - Kept fresh by explicit put()/invalidate() from add/delete bot flows.
+    - Entries expire after a bounded TTL as a fallback (e.g. edits made
+      by another process), then are re-read from DB on demand.
+    - "Not found" results are cached for a short time so junk UIDs
+      can't hammer the database.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: int = 300,
+        negative_ttl_seconds: int = 30,
+        maxsize: int = 100_000,
+    ) -> None:
+        self.configure(
+            ttl_seconds=ttl_seconds,
+            negative_ttl_seconds=negative_ttl_seconds,
+            maxsize=maxsize,
+        )
+        self._lock = asyncio.Lock()
+
+    def configure(
+        self,
+        *,
+        ttl_seconds: int,
+        negative_ttl_seconds: int,
+        maxsize: int = 100_000,
+    ) -> None:
+        """Apply TTLs from settings; call load() afterwards to refill."""
+        self._tenants: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl_seconds)
+        self._missing: TTLCache = TTLCache(maxsize=maxsize, ttl=negative_ttl_seconds)
+
+    async def load(self) -> int:
+        """Bulk-load all tenants from DB. Returns the number of loaded tenants."""
+        async with self._lock:
+            tenants = await Tenant.all()
+            for tenant in tenants:
+                self._tenants[tenant.uuid] = tenant
+                self._missing.pop(tenant.uuid, None)
+        log.info("tenant_registry_loaded", extra={"count": len(tenants)})
+        return len(tenants)
+
+    async def get(self, uid: str) -> Optional[Tenant]:
+        """
+        Get tenant by UID from memory; fall back to DB on miss.
+        Returns None for unknown UIDs (negative result is cached).
+        """
+        tenant = self._tenants.get(uid)
+        if tenant is not None:
+            return tenant
+        if uid in self._missing:
+            return None
+
+        tenant = await TenantManager.get_by_uid(uid)
+        if tenant is None:
+            self._missing[uid] = True
+            return None
+
+        self._tenants[uid] = tenant
+        return tenant
+
+    def put(self, tenant: Tenant) -> None:
+        """Register (or replace) a tenant, e.g. right after it was created."""
+        self._tenants[tenant.uuid] = tenant
+        self._missing.pop(tenant.uuid, None)
+
+    def invalidate(self, uid: str) -> None:
+        """Forget everything known about a tenant UID."""
+        self._tenants.pop(uid, None)
+        self._missing.pop(uid, None)
+
+    def clear(self) -> None:
+        self._tenants.clear()
+        self._missing.clear()
+
+
+# Used by the tenant webhook handler and by the main bot's tenant handlers
+tenant_registry = TenantRegistry()
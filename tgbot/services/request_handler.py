@@ -3,23 +3,44 @@ from typing import Any, Dict, Optional
 
 from aiogram import Bot, Dispatcher
 from aiogram.client.default import DefaultBotProperties
-from aiogram.webhook.aiohttp_server import BaseRequestHandler
+from aiogram.client.session.base import BaseSession
+from aiogram.webhook.aiohttp_server import BaseRequestHandler, SimpleRequestHandler
 from aiohttp import web
 from aiohttp.abc import Application
 
 from tgbot.common.logging_setup import log
 from tgbot.common.logging_setup import tenant_id_var as ctx_tenant
-from tgbot.database.managers import TenantManager
+from tgbot.services.bot_pool import BotPool
+from tgbot.services.context import current_tenant_var
+from tgbot.services.registry import TenantRegistry, tenant_registry
+from tgbot.services.supervisor import UpdateSupervisor
 from tgbot.services.tenants import TenantService
 
 
+class SharedSessionRequestHandler(SimpleRequestHandler):
+    """
+    SimpleRequestHandler for a bot on the app-wide shared session: shutdown
+    must not close that session while tenant updates are still draining,
+    the app closes it in on_cleanup.
+    """
+
+    async def close(self) -> None:
+        return None
+
+
 class UUIDBasedRequestHandler(BaseRequestHandler):
     """
     Multi-tenant webhook handler:
     - Tenant is determined by {uid} in the URL path.
+    - Tenant existence is checked via in-memory TenantRegistry (no DB hit).
     - Bot token is loaded from Vault via TenantService (cached).
     - Keeps tenant_id context var set for the WHOLE request handling,
       so downstream logs (e.g., aiogram.event) include tenant_id.
+    - Resolved Tenant model is kept in current_tenant_var for the update,
+      so handlers reuse it instead of querying the DB again.
+    - Background updates run through a bounded UpdateSupervisor that serves
+      per-tenant queues round-robin; when a queue is full the webhook
+      answers 429 so Telegram retries later.
     """
 
     def __init__(
@@ -30,6 +51,11 @@ class UUIDBasedRequestHandler(BaseRequestHandler):
         handle_in_background: bool = True,
         secret_token: Optional[str] = None,
         bot_settings: Optional[Dict[str, Any]] = None,
+        registry: Optional[TenantRegistry] = None,
+        max_bots: int = 1000,
+        bot_idle_seconds: float = 3600,
+        session: Optional[BaseSession] = None,
+        supervisor: Optional[UpdateSupervisor] = None,
         **data: Any,
     ) -> None:
         super().__init__(
@@ -38,8 +64,14 @@ class UUIDBasedRequestHandler(BaseRequestHandler):
         self.secret_token = secret_token
         self.bot_settings = bot_settings or {}
         self.tenant_service = tenant_service
-        # Bot instances cache: tenant_uid -> Bot
-        self.bots: Dict[str, Bot] = {}
+        self.registry = registry or tenant_registry
+        # Shared HTTP session for all tenant bots (owned by the caller)
+        self.session = session
+        # Bot instances pool: tenant_uid -> Bot (LRU + idle eviction)
+        self.bots = BotPool(
+            max_size=max_bots, idle_seconds=bot_idle_seconds, shared_session=session
+        )
+        self.supervisor = supervisor or UpdateSupervisor()
 
     def verify_secret(self, telegram_secret_token: str, bot: Bot) -> bool:
         """
@@ -61,8 +93,7 @@ class UUIDBasedRequestHandler(BaseRequestHandler):
         super().register(app, path=path, **kwargs)
 
         async def _cleanup(_app: Application):
-            for bot in self.bots.values():
-                await bot.session.close()
+            await self.bots.close()
 
         app.on_cleanup.append(_cleanup)
 
@@ -74,26 +105,30 @@ class UUIDBasedRequestHandler(BaseRequestHandler):
         """
         uid = request.match_info.get("uid")
         token = ctx_tenant.set(uid)  # keep tenant in context for the whole request
+        tenant_token = current_tenant_var.set(None)  # filled by resolve_bot
         try:
             return await super().handle(request)
         finally:
             # Reset AFTER aiogram finished processing and logging
+            current_tenant_var.reset(tenant_token)
             ctx_tenant.reset(token)
 
     async def resolve_bot(self, request: web.Request) -> Bot:
         """
         Resolve/create a Bot for the given tenant UID:
-        - Check tenant exists and is active in DB
+        - Check tenant exists and is active (registry, DB on miss)
         - Load bot token from Vault via TenantService (async, cached)
         - Recreate Bot if token has changed (rotation)
         """
         uid = request.match_info["uid"]
 
         # Ensure tenant exists and is active
-        tenant = await TenantManager.get_by_uid(uid)
+        tenant = await self.registry.get(uid)
         if not tenant or not getattr(tenant, "is_active", True):
             log.warning("tenant_not_found", extra={"tenant_uid": uid})
             raise web.HTTPNotFound(text="Tenant not found")
+        # Request-scoped: background feed task copies this context
+        current_tenant_var.set(tenant)
 
         # Load token (cache first, Vault on miss)
         ctx = await self.tenant_service.get_context(uid)
@@ -101,13 +136,13 @@ class UUIDBasedRequestHandler(BaseRequestHandler):
         # Reuse or recreate Bot if token rotated
         bot = self.bots.get(uid)
         if bot is None or bot.token != ctx.bot_token:
-            if bot is not None:
-                await bot.session.close()
             bot = Bot(
                 token=ctx.bot_token,
+                session=self.session,
                 default=DefaultBotProperties(parse_mode="HTML"),
             )
-            self.bots[uid] = bot
+            # replaced bot (token rotation) is closed by the pool
+            self.bots.put(uid, bot)
 
         # expose tenant-specific webhook secret for downstream verification
         setattr(bot, "_webhook_secret", ctx.webhook_secret)
@@ -115,6 +150,22 @@ class UUIDBasedRequestHandler(BaseRequestHandler):
         log.info("tenant_resolved", extra={"tenant_uid": uid})
         return bot
 
+    async def _handle_request_background(
+        self, bot: Bot, request: web.Request
+    ) -> web.Response:
+        """Hand the update to the supervisor instead of an unbounded task."""
+        update = await request.json(loads=bot.session.json_loads)
+        accepted = self.supervisor.submit(
+            request.match_info["uid"],
+            self._background_feed_update(bot=bot, update=update),
+        )
+        if not accepted:
+            # Telegram redelivers the update later
+            return web.json_response(
+                {"ok": False}, status=429, headers={"Retry-After": "1"}
+            )
+        return web.json_response({}, dumps=bot.session.json_dumps)
+
     async def close(self) -> None:
-        for bot in self.bots.values():
-            await bot.session.close()
+        await self.supervisor.close()
+        await self.bots.close()
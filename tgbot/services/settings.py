@@ -1,8 +1,12 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from typing import Optional
+
+from cachetools import TTLCache
 
 from tgbot.database.models import TenantSettings
+from tgbot.services.cache_bus import SETTINGS, cache_bus
 
 
 @dataclass(slots=True)
@@ -37,26 +41,78 @@ class SubscriptionConfig:
         return f"@{username}"
 
 
+class SubscriptionConfigCache:
+    """
+    Per-tenant SubscriptionConfig cache (tenant_id -> config).
+    Writers refresh the entry; TTL is only a fallback for out-of-process edits.
+    """
+
+    def __init__(self, ttl_seconds: int = 300, maxsize: int = 10_000) -> None:
+        self.configure(ttl_seconds=ttl_seconds, maxsize=maxsize)
+
+    def configure(self, *, ttl_seconds: int, maxsize: int = 10_000) -> None:
+        self._cache: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl_seconds)
+
+    def get(self, tenant_id: int) -> Optional[SubscriptionConfig]:
+        return self._cache.get(tenant_id)
+
+    def put(self, tenant_id: int, config: SubscriptionConfig) -> None:
+        self._cache[tenant_id] = config
+
+    def invalidate(self, tenant_id: int) -> None:
+        self._cache.pop(tenant_id, None)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+
+# Default cache of TenantSettingsService
+subscription_cache = SubscriptionConfigCache()
+
+
 class TenantSettingsService:
     """Service for managing tenant-wide settings."""
 
-    def __init__(self, tenant_id: int) -> None:
+    def __init__(
+        self, tenant_id: int, cache: SubscriptionConfigCache | None = None
+    ) -> None:
         self.tenant_id = tenant_id
+        self.cache = cache or subscription_cache
 
     async def get_settings(self) -> TenantSettings:
         settings, _ = await TenantSettings.get_or_create(tenant_id=self.tenant_id)
         return settings
 
     async def get_subscription_config(self) -> SubscriptionConfig:
-        settings = await self.get_settings()
-        return SubscriptionConfig(
-            required=settings.require_subscription and bool(settings.subscription_channel),
-            channel_username=settings.subscription_channel,
-        )
+        """
+        Hot path: served from cache. On miss a plain SELECT is used; rows are
+        created together with the tenant, so nothing is inserted here.
+        """
+        config = self.cache.get(self.tenant_id)
+        if config is not None:
+            return config
+
+        settings = await TenantSettings.get_or_none(tenant_id=self.tenant_id)
+        config = self._to_config(settings)
+        self.cache.put(self.tenant_id, config)
+        return config
 
     async def update_subscription(self, channel_username: str | None) -> SubscriptionConfig:
         settings = await self.get_settings()
         settings.subscription_channel = channel_username
         settings.require_subscription = bool(channel_username)
         await settings.save()
-        return await self.get_subscription_config()
+        config = self._to_config(settings)
+        self.cache.put(self.tenant_id, config)
+        cache_bus.publish(SETTINGS, self.tenant_id)
+        return config
+
+    @staticmethod
+    def _to_config(settings: TenantSettings | None) -> SubscriptionConfig:
+        if settings is None:
+            # Tenant created before settings rows were seeded: defaults
+            return SubscriptionConfig(required=False, channel_username=None)
+        return SubscriptionConfig(
+            required=settings.require_subscription and bool(settings.subscription_channel),
+            channel_username=settings.subscription_channel,
+        )
@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+from collections import Counter, deque
+from dataclasses import dataclass
+from typing import Any, Coroutine, Deque, Dict, Set
+
+from tgbot.common.logging_setup import log
+
+OVERFLOW_REJECT = "reject"
+OVERFLOW_DROP_OLDEST = "drop_oldest"
+
+
+@dataclass(slots=True)
+class _Job:
+    tenant_uid: str
+    coro: Coroutine[Any, Any, Any]
+    context: contextvars.Context
+
+
+class UpdateSupervisor:
+    """
+    Bounded, tenant-fair executor for webhook updates handled in background:
+    - at most `max_concurrency` updates run at once, and at most
+      `per_tenant_concurrency` per tenant;
+    - waiting updates sit in per-tenant FIFO queues (`per_tenant_queue_size`
+      each, `queue_size` in total) served by deficit round-robin: every
+      tenant with queued updates may start up to `quantum` of them per turn,
+      so a noisy tenant cannot delay a quiet one by more than one round;
+    - on overflow either reject the new update (`reject`: webhook answers
+      429 and Telegram retries later) or drop the oldest queued update of
+      the same tenant, or of the longest queue if the global limit was hit
+      (`drop_oldest`).
+    Jobs keep the contextvars of the request that submitted them.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_concurrency: int = 200,
+        per_tenant_concurrency: int = 10,
+        queue_size: int = 5000,
+        per_tenant_queue_size: int = 500,
+        quantum: int = 1,
+        overflow: str = OVERFLOW_REJECT,
+    ) -> None:
+        if overflow not in (OVERFLOW_REJECT, OVERFLOW_DROP_OLDEST):
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+        self.max_concurrency = max_concurrency
+        self.per_tenant_concurrency = per_tenant_concurrency
+        self.queue_size = queue_size
+        self.per_tenant_queue_size = per_tenant_queue_size
+        self.quantum = max(quantum, 1)
+        self.overflow = overflow
+
+        # tenant_uid -> queued jobs; `_active` is the round-robin ring of
+        # tenants with a non-empty queue, `_deficit` their remaining quantum
+        self._queues: Dict[str, Deque[_Job]] = {}
+        self._active: Deque[str] = deque()
+        self._deficit: Dict[str, int] = {}
+        self._queued = 0
+        self._tasks: Set[asyncio.Task] = set()
+        self._running: Counter[str] = Counter()
+        self.rejected = 0
+        self.dropped = 0
+        self.completed = 0
+
+    def submit(self, tenant_uid: str, coro: Coroutine[Any, Any, Any]) -> bool:
+        """
+        Run `coro` now or queue it. Returns False if the update was rejected
+        (queue full with `reject` policy); the coroutine is closed then.
+        """
+        job = _Job(tenant_uid, coro, contextvars.copy_context())
+        queue = self._queues.get(tenant_uid)
+        # keep per-tenant order: start now only if nothing of it is queued
+        if not queue and self._can_start(tenant_uid):
+            self._start(job)
+            return True
+
+        tenant_full = queue is not None and len(queue) >= self.per_tenant_queue_size
+        if tenant_full or self._queued >= self.queue_size:
+            if self.overflow == OVERFLOW_REJECT:
+                coro.close()
+                self.rejected += 1
+                log.warning("update_rejected", extra={"tenant_uid": tenant_uid})
+                return False
+            victim = tenant_uid if tenant_full else self._longest_queue()
+            self._drop_oldest(victim)
+
+        queue = self._queues.get(tenant_uid)
+        if queue is None:
+            queue = self._queues[tenant_uid] = deque()
+            self._active.append(tenant_uid)
+            self._deficit[tenant_uid] = 0
+        queue.append(job)
+        self._queued += 1
+        self._drain()
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": self._queued,
+            "in_flight": len(self._tasks),
+            "tenants_queued": len(self._active),
+            "tenants_in_flight": len(self._running),
+            "rejected": self.rejected,
+            "dropped": self.dropped,
+            "completed": self.completed,
+        }
+
+    async def close(self, timeout: float = 10) -> None:
+        """Drop queued updates and wait (bounded) for in-flight ones."""
+        pending = self._queued
+        for queue in self._queues.values():
+            for job in queue:
+                job.coro.close()
+        self._queues.clear()
+        self._active.clear()
+        self._deficit.clear()
+        self._queued = 0
+        if pending:
+            log.warning("updates_dropped_on_shutdown", extra={"count": pending})
+        if self._tasks:
+            await asyncio.wait(set(self._tasks), timeout=timeout)
+
+    def _can_start(self, tenant_uid: str) -> bool:
+        return (
+            len(self._tasks) < self.max_concurrency
+            and self._running[tenant_uid] < self.per_tenant_concurrency
+        )
+
+    def _start(self, job: _Job) -> None:
+        self._running[job.tenant_uid] += 1
+        # create the task inside the submitter's context (tenant_id, tenant)
+        task = job.context.run(asyncio.create_task, job.coro)
+        self._tasks.add(task)
+        task.add_done_callback(lambda t, uid=job.tenant_uid: self._on_done(t, uid))
+
+    def _longest_queue(self) -> str:
+        return max(self._queues, key=lambda uid: len(self._queues[uid]))
+
+    def _drop_oldest(self, tenant_uid: str) -> None:
+        queue = self._queues[tenant_uid]
+        queue.popleft().coro.close()
+        self._queued -= 1
+        if not queue:
+            self._forget(tenant_uid)
+            self._active.remove(tenant_uid)
+        self.dropped += 1
+        log.warning("update_dropped", extra={"tenant_uid": tenant_uid})
+
+    def _forget(self, tenant_uid: str) -> None:
+        del self._queues[tenant_uid]
+        del self._deficit[tenant_uid]
+
+    def _on_done(self, task: asyncio.Task, tenant_uid: str) -> None:
+        self._tasks.discard(task)
+        self._running[tenant_uid] -= 1
+        if self._running[tenant_uid] <= 0:
+            del self._running[tenant_uid]
+        self.completed += 1
+        if not task.cancelled() and task.exception() is not None:
+            log.error(
+                "update_handling_failed",
+                exc_info=task.exception(),
+                extra={"tenant_uid": tenant_uid},
+            )
+        self._drain()
+
+    def _drain(self) -> None:
+        """
+        Deficit round-robin over tenants with queued updates. The tenant at
+        the head of the ring keeps its turn until its quantum is spent;
+        tenants at their concurrency limit are skipped and lose the turn.
+        """
+        blocked = 0
+        while (
+            self._active
+            and len(self._tasks) < self.max_concurrency
+            and blocked < len(self._active)
+        ):
+            uid = self._active[0]
+            if self._running[uid] >= self.per_tenant_concurrency:
+                self._deficit[uid] = 0
+                self._active.rotate(-1)
+                blocked += 1
+                continue
+            blocked = 0
+            if self._deficit[uid] < 1:
+                self._deficit[uid] += self.quantum
+            queue = self._queues[uid]
+            self._start(queue.popleft())
+            self._queued -= 1
+            self._deficit[uid] -= 1
+            if not queue:
+                self._active.popleft()
+                self._forget(uid)
+            elif self._deficit[uid] < 1:
+                self._active.rotate(-1)
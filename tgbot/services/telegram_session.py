@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import asyncio
+import ssl
+from typing import Any, Optional
+
+import certifi
+from aiogram import __version__ as aiogram_version
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+from aiohttp import ClientSession, TCPConnector
+from aiohttp.hdrs import USER_AGENT
+from aiohttp.http import SERVER_SOFTWARE
+
+
+class PooledAiohttpSession(AiohttpSession):
+    """
+    AiohttpSession with a fully configurable TCPConnector (AiohttpSession
+    itself only exposes `limit`). The ClientSession is built here through
+    the public create_session()/close() hooks, so aiogram internals are
+    not touched. Proxies are not supported.
+    """
+
+    def __init__(
+        self,
+        *,
+        limit: int = 100,
+        limit_per_host: int = 0,
+        keepalive_timeout: float = 60,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(limit=limit, **kwargs)
+        self._connector_options = {
+            "limit": limit,
+            "limit_per_host": limit_per_host,
+            "keepalive_timeout": keepalive_timeout,
+            "ttl_dns_cache": 3600,
+        }
+        self._client: Optional[ClientSession] = None
+
+    async def create_session(self) -> ClientSession:
+        if self._client is None or self._client.closed:
+            self._client = ClientSession(
+                connector=TCPConnector(
+                    ssl=ssl.create_default_context(cafile=certifi.where()),
+                    **self._connector_options,
+                ),
+                headers={USER_AGENT: f"{SERVER_SOFTWARE} aiogram/{aiogram_version}"},
+            )
+        return self._client
+
+    async def close(self) -> None:
+        if self._client is not None and not self._client.closed:
+            await self._client.close()
+            # let SSL connections shut down gracefully (as AiohttpSession does)
+            await asyncio.sleep(0.25)
+
+
+def create_telegram_session(
+    *,
+    limit: int = 100,
+    limit_per_host: int = 0,
+    keepalive_timeout: float = 60,
+    api_url: Optional[str] = None,
+) -> AiohttpSession:
+    """
+    Build one AiohttpSession to be shared by every Bot in the process.
+    aiogram puts the token into the request URL, so a single session (and its
+    keep-alive connection pool to api.telegram.org) serves any number of bots.
+    The session is owned by the caller: bots using it must not close it.
+    `api_url` points bots to a local Bot API server (or a fake one in benches).
+    """
+    session = PooledAiohttpSession(
+        limit=limit,
+        limit_per_host=limit_per_host,
+        keepalive_timeout=keepalive_timeout,
+    )
+    if api_url:
+        session.api = TelegramAPIServer.from_base(api_url)
+    return session
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from typing import Any, Optional, Tuple
+
+from cachetools import TTLCache
+
+from tgbot.database.managers import TenantUserManager
+from tgbot.database.models import TenantUser
+from tgbot.services.write_behind import write_behind
+
+
+class KnownUsersCache:
+    """
+    Per-tenant cache of subscribers already stored in `tenant_user`:
+    (tenant_id, tg_id) -> hash of the profile fields (full_name, username).
+    - register() of a known user with an unchanged profile is a no-op;
+    - new users and changed profiles are queued to the write-behind buffer
+      (or written with one upsert right away if the buffer is not running
+      or full).
+    Entries expire after `ttl_seconds`, so rows changed outside this
+    process are re-synced eventually.
+    """
+
+    def __init__(self, maxsize: int = 200_000, ttl_seconds: int = 86_400) -> None:
+        self.configure(maxsize=maxsize, ttl_seconds=ttl_seconds)
+
+    def configure(self, *, maxsize: int, ttl_seconds: int) -> None:
+        self._cache: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl_seconds)
+
+    @staticmethod
+    def _profile(telegram_user: Any) -> Tuple[Optional[str], Optional[str]]:
+        return (
+            getattr(telegram_user, "full_name", None),
+            getattr(telegram_user, "username", None),
+        )
+
+    async def register(self, tenant_id: int, telegram_user: Any) -> bool:
+        """Store/refresh the subscriber if needed. Returns False if nothing changed."""
+        key = (tenant_id, telegram_user.id)
+        full_name, username = profile = self._profile(telegram_user)
+        profile_hash = hash(profile)
+        if self._cache.get(key) == profile_hash:
+            return False
+
+        if write_behind.running and write_behind.add_tenant_user(
+            tenant_id, telegram_user.id, full_name, username
+        ):
+            self._cache[key] = profile_hash
+            return True
+
+        await TenantUserManager.upsert_many(
+            [
+                TenantUser(
+                    tenant_id=tenant_id,
+                    tg_id=telegram_user.id,
+                    full_name=full_name,
+                    username=username,
+                )
+            ]
+        )
+        self._cache[key] = profile_hash
+        return True
+
+
+known_users = KnownUsersCache()
@@ -1,9 +1,12 @@
 import asyncio
+import time
 from dataclasses import dataclass
-from typing import Dict, List, Mapping, Optional
+from typing import Dict, List, Mapping, Optional, Set
 
-from cachetools import TTLCache
+from cachetools import LRUCache
+from hvac import exceptions as hvac_exceptions
 
+from tgbot.common.logging_setup import log
 from tgbot.services.vault import VaultClient
 
 
@@ -15,17 +18,58 @@ class TenantContext:
     webhook_secret: Optional[str] = None
 
 
+@dataclass(slots=True)
+class _Entry:
+    ctx: TenantContext
+    fetched_at: float  # monotonic, last Vault read or version check
+    read_at: float  # monotonic, last full secret read
+    # last get_context() hit; only recently used entries are renewed
+    accessed_at: float
+
+
 class TenantService:
     """
     Service for loading tenant-specific secrets from Vault:
     kv/tgbot/tenants/<uid>, with in-memory TTL cache.
+    - Single-flight: concurrent misses for one UID share one Vault read.
+    - Stale-while-revalidate: an entry older than `ttl_seconds` (but younger
+      than `stale_ttl_seconds`) is served as is while a background refresh
+      runs, so TTL expiry never blocks an update.
+    - warm_up() bulk-loads contexts at startup; run_refresher() renews
+      entries shortly before their TTL ends, but only for tenants used
+      within the last TTL; idle entries age out and are dropped.
+    - With `change_detection`, entries are fresh for `version_check_seconds`
+      (instead of `ttl_seconds`); renewal then reads only the secret's KV v2
+      metadata and re-reads the secret if `current_version` moved
+      (TenantContext.version) or the data is older than `data_ttl_seconds`.
+      So rotations show up within the short check interval, while full
+      reads happen on change only.
     """
 
     def __init__(
-        self, vault: VaultClient, ttl_seconds: int = 60, max_concurrency: int = 10
+        self,
+        vault: VaultClient,
+        ttl_seconds: int = 60,
+        max_concurrency: int = 10,
+        stale_ttl_seconds: Optional[int] = None,
+        maxsize: int = 100_000,
+        change_detection: bool = True,
+        version_check_seconds: int = 30,
+        data_ttl_seconds: int = 3600,
     ):
         self._vault = vault
-        self._cache = TTLCache(maxsize=1000, ttl=ttl_seconds)
+        # how long an entry is served before it is renewed/revalidated
+        self._ttl = version_check_seconds if change_detection else ttl_seconds
+        self._data_ttl = data_ttl_seconds
+        self._change_detection = change_detection
+        self._stale_ttl = (
+            stale_ttl_seconds if stale_ttl_seconds is not None else ttl_seconds * 10
+        )
+        # tenant_uid -> _Entry
+        self._cache: LRUCache = LRUCache(maxsize=maxsize)
+        # tenant_uid -> in-flight Vault read shared by all waiters
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._refreshing: Set[asyncio.Task] = set()
         # Limit concurrent Vault reads to avoid thundering herd
         self._sem = asyncio.Semaphore(max_concurrency)
 
@@ -33,25 +77,10 @@ class TenantService:
         """
         Get single tenant context from cache or Vault.
         """
-        cached = self._cache.get(tenant_uid)
+        cached = self._cached(tenant_uid)
         if cached is not None:
             return cached
-
-        data = await asyncio.to_thread(
-            self._vault.read_kv, f"tgbot/tenants/{tenant_uid}"
-        )
-        token = data.get("bot_token")
-        if not token:
-            raise RuntimeError(f"Vault: bot_token missing for tenant {tenant_uid}")
-
-        ctx = TenantContext(
-            tenant_uid=tenant_uid,
-            bot_token=token,
-            version=data.get("version", 1),
-            webhook_secret=self._extract_secret(data),
-        )
-        self._cache[tenant_uid] = ctx
-        return ctx
+        return await self._load(tenant_uid)
 
     async def get_contexts(self, tenant_uids: List[str]) -> Dict[str, TenantContext]:
         """
@@ -65,7 +94,7 @@ class TenantService:
 
         # First pass: pull from cache
         for uid in tenant_uids:
-            cached = self._cache.get(uid)
+            cached = self._cached(uid)
             if cached is not None:
                 result[uid] = cached
             else:
@@ -74,37 +103,176 @@ class TenantService:
         if not to_fetch:
             return result
 
-        async def fetch_one(uid: str):
-            # Semaphore limits parallelism against Vault
-            async with self._sem:
-                data = await asyncio.to_thread(
-                    self._vault.read_kv, f"tgbot/tenants/{uid}"
-                )
-            token = data.get("bot_token")
-            if not token:
-                raise RuntimeError(f"Vault: bot_token missing for tenant {uid}")
-            ctx = TenantContext(
-                tenant_uid=uid,
-                bot_token=token,
-                version=data.get("version", 1),
-                webhook_secret=self._extract_secret(data),
-            )
-            # Put into cache and result map
-            self._cache[uid] = ctx
+        # Fetch all misses concurrently (semaphore is applied in _fetch)
+        contexts = await asyncio.gather(*(self._load(uid) for uid in to_fetch))
+        for uid, ctx in zip(to_fetch, contexts):
             result[uid] = ctx
+        return {uid: result[uid] for uid in tenant_uids if uid in result}
+
+    async def warm_up(self, tenant_uids: List[str]) -> int:
+        """
+        Load contexts for the given tenants into the cache (startup warm-up).
+        Failures are logged and skipped. Returns the number of loaded contexts.
+        """
+        results = await asyncio.gather(
+            # not an access: warmed entries are renewed only once used
+            *(self._load(uid, touch=False) for uid in tenant_uids),
+            return_exceptions=True,
+        )
+        failed = [uid for uid, r in zip(tenant_uids, results) if isinstance(r, Exception)]
+        if failed:
+            log.warning(
+                "tenant_contexts_warm_up_failed",
+                extra={"count": len(failed), "tenant_uids": failed[:20]},
+            )
+        loaded = len(tenant_uids) - len(failed)
+        log.info("tenant_contexts_warmed_up", extra={"count": loaded})
+        return loaded
+
+    async def refresh_expiring(self, ahead_seconds: float) -> int:
+        """
+        Re-read from Vault every recently used cached context that expires
+        within `ahead_seconds` (or already serves as stale); drop entries
+        past the stale window. Returns refreshed count.
+        """
+        now = time.monotonic()
+        due = []
+        for uid, entry in list(self._cache.items()):
+            age = now - entry.fetched_at
+            if age > self._stale_ttl:
+                self._cache.pop(uid, None)
+            elif age >= self._ttl - ahead_seconds and now - entry.accessed_at <= self._ttl:
+                due.append(uid)
+        if not due:
+            return 0
+        results = await asyncio.gather(
+            *(self._load(uid, revalidate=True) for uid in due), return_exceptions=True
+        )
+        failed = sum(isinstance(r, Exception) for r in results)
+        if failed:
+            log.warning("tenant_contexts_refresh_failed", extra={"count": failed})
+        return len(due) - failed
 
-        # Fetch all misses concurrently
-        await asyncio.gather(*(fetch_one(uid) for uid in to_fetch))
-        return result
+    async def run_refresher(self, *, ahead_seconds: float, interval: float) -> None:
+        """Call refresh_expiring() every `interval` seconds until cancelled."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.refresh_expiring(ahead_seconds)
+            except Exception:
+                log.exception("tenant_contexts_refresher_failed")
 
     def put_context(self, ctx: TenantContext):
         """Manually put a tenant context into the cache."""
-        self._cache[ctx.tenant_uid] = ctx
+        # a read started before this write must not overwrite it
+        self._inflight.pop(ctx.tenant_uid, None)
+        now = time.monotonic()
+        self._cache[ctx.tenant_uid] = _Entry(ctx, now, now, now)
 
     def invalidate(self, tenant_uid: str):
         """Remove a tenant context from the cache."""
+        self._inflight.pop(tenant_uid, None)
         self._cache.pop(tenant_uid, None)
 
+    def _cached(self, tenant_uid: str) -> Optional[TenantContext]:
+        """Return usable cached context; schedule a refresh if it is stale."""
+        entry: Optional[_Entry] = self._cache.get(tenant_uid)
+        if entry is None:
+            return None
+        now = time.monotonic()
+        age = now - entry.fetched_at
+        if age > self._stale_ttl:
+            return None
+        entry.accessed_at = now
+        if age > self._ttl:
+            self._refresh_in_background(tenant_uid)
+        return entry.ctx
+
+    def _refresh_in_background(self, tenant_uid: str) -> None:
+        if tenant_uid in self._inflight:
+            return
+        task = asyncio.create_task(self._load(tenant_uid, revalidate=True))
+        self._refreshing.add(task)
+        task.add_done_callback(self._on_refreshed)
+
+    def _on_refreshed(self, task: asyncio.Task) -> None:
+        self._refreshing.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            # keep serving the stale value; next access retries
+            log.warning("tenant_context_refresh_failed", exc_info=task.exception())
+
+    async def _load(
+        self, tenant_uid: str, revalidate: bool = False, touch: bool = True
+    ) -> TenantContext:
+        """Single-flight Vault read: join the in-flight fetch or start one."""
+        task = self._inflight.get(tenant_uid)
+        if task is None:
+            task = asyncio.create_task(self._fetch(tenant_uid, revalidate, touch))
+            self._inflight[tenant_uid] = task
+
+            def _done(t: asyncio.Task, uid: str = tenant_uid) -> None:
+                if self._inflight.get(uid) is t:
+                    del self._inflight[uid]
+
+            task.add_done_callback(_done)
+        # shield: a cancelled waiter must not cancel the shared fetch
+        return await asyncio.shield(task)
+
+    async def _fetch(
+        self, tenant_uid: str, revalidate: bool = False, touch: bool = True
+    ) -> TenantContext:
+        path = f"tgbot/tenants/{tenant_uid}"
+        item: Optional[_Entry] = self._cache.get(tenant_uid)
+        if item is not None:
+            accessed_at = item.accessed_at
+        else:
+            # a miss is loaded for a caller: count it as an access
+            accessed_at = time.monotonic() if touch else float("-inf")
+        # Semaphore limits parallelism against Vault
+        async with self._sem:
+            if (
+                revalidate
+                and self._change_detection
+                and item is not None
+                and time.monotonic() - item.read_at < self._data_ttl
+            ):
+                current = await self._current_version(path)
+                if current is not None and current == item.ctx.version:
+                    if self._inflight.get(tenant_uid) is asyncio.current_task():
+                        item.fetched_at = time.monotonic()
+                    return item.ctx
+            # this cache is the only one for tenant secrets
+            data, version = await self._vault.read_kv_versioned(path)
+        token = data.get("bot_token")
+        if not token:
+            raise RuntimeError(f"Vault: bot_token missing for tenant {tenant_uid}")
+
+        ctx = TenantContext(
+            tenant_uid=tenant_uid,
+            bot_token=token,
+            version=version,
+            webhook_secret=self._extract_secret(data),
+        )
+        if item is not None and item.ctx.version != version:
+            log.info(
+                "tenant_context_version_changed",
+                extra={"tenant_uid": tenant_uid, "version": version},
+            )
+        # skip the write if invalidate()/put_context() happened meanwhile
+        if self._inflight.get(tenant_uid) is asyncio.current_task():
+            now = time.monotonic()
+            self._cache[tenant_uid] = _Entry(ctx, now, now, accessed_at)
+        return ctx
+
+    async def _current_version(self, path: str) -> Optional[int]:
+        """KV v2 current_version, or None if metadata is not readable."""
+        try:
+            meta = await self._vault.read_metadata(path)
+        except hvac_exceptions.Forbidden:
+            # policy without metadata access: fall back to a full read
+            return None
+        return int(meta.get("current_version") or 0)
+
     @staticmethod
     def _extract_secret(data: Mapping[str, object]) -> Optional[str]:
         """Return tenant-specific webhook secret if provided."""
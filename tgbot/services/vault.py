@@ -1,14 +1,25 @@
 # tgbot/services/vault.py
+import asyncio
+import contextlib
+import ssl
 import time
-from typing import Dict, Optional, Tuple
+from typing import Any, Dict, Optional, Tuple
 
-import hvac
+import aiohttp
+from hvac import exceptions as hvac_exceptions
+from hvac.utils import raise_for_error
+
+from tgbot.common.logging_setup import log
 
 
 class VaultClient:
     """
-    Minimal Vault KV v2 client with optional AppRole auth and a simple TTL cache.
-    Works with modern hvac (client.auth.approle.login).
+    Minimal asyncio Vault KV v2 client with optional AppRole auth and a simple
+    TTL cache. Built on aiohttp with a pooled keep-alive connection, so no
+    call blocks the event loop. Errors are raised as hvac exceptions
+    (InvalidPath, Forbidden, ...), same as the previous hvac-based client.
+
+    Usage: `await client.login()` once, `await client.close()` on shutdown.
     """
 
     def __init__(
@@ -21,8 +32,10 @@ class VaultClient:
         secret_id: Optional[str] = None,
         ttl: int = 60,
         verify: bool | str = False,  # bool or path to CA bundle
+        pool_limit: int = 20,
+        timeout: float = 10,
     ):
-        self.addr = addr
+        self.addr = addr.rstrip("/")
         self.mount = mount
         self._token = token
         self._role_id = role_id
@@ -31,30 +44,133 @@ class VaultClient:
         self._cache: Dict[str, Tuple[float, Dict]] = {}
 
         # Do NOT default to verify=False in prod. Pass a CA path if needed.
-        self._client = hvac.Client(url=addr, verify=verify)
+        if isinstance(verify, str):
+            self._ssl: ssl.SSLContext | bool = ssl.create_default_context(cafile=verify)
+        else:
+            self._ssl = verify
+        self._pool_limit = pool_limit
+        self._timeout = aiohttp.ClientTimeout(total=timeout)
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._client_token: Optional[str] = None
+        self._renew_task: Optional[asyncio.Task] = None
+        self._login_lock = asyncio.Lock()
 
-        self._login()
+    # --- auth -------------------------------------------------------------
 
-    def _login(self) -> None:
+    async def login(self) -> None:
         """
-        Authenticate either with a pre-issued token or via AppRole.
-        Modern hvac uses client.auth.approle.login(role_id=..., secret_id=...).
+        Authenticate either with a pre-issued token or via AppRole and start
+        background renewal for renewable tokens.
         """
-        if self._token:
-            self._client.token = self._token
-            return
+        async with self._login_lock:
+            if self._token:
+                self._client_token = self._token
+                try:
+                    lookup = await self._request("GET", "auth/token/lookup-self")
+                except hvac_exceptions.Forbidden:
+                    lookup = {}  # token may lack lookup-self policy: no renewal
+                data = lookup.get("data") or {}
+                ttl, renewable = data.get("ttl") or 0, bool(data.get("renewable"))
+            elif self._role_id and self._secret_id:
+                self._client_token = None
+                resp = await self._request(
+                    "POST",
+                    "auth/approle/login",
+                    json={"role_id": self._role_id, "secret_id": self._secret_id},
+                    auth=False,
+                )
+                auth = resp.get("auth") or {}
+                self._client_token = auth.get("client_token")
+                if not self._client_token:
+                    raise RuntimeError("Vault AppRole login failed")
+                ttl, renewable = auth.get("lease_duration") or 0, bool(auth.get("renewable"))
+            else:
+                raise RuntimeError("Vault credentials missing (token or AppRole)")
+
+        self._schedule_renewal(ttl, renewable)
+
+    def _schedule_renewal(self, ttl: int, renewable: bool) -> None:
+        if self._renew_task is not None and self._renew_task is not asyncio.current_task():
+            self._renew_task.cancel()
+        self._renew_task = None
+        if ttl > 0 and (renewable or self._role_id):
+            self._renew_task = asyncio.create_task(self._renew_loop(ttl, renewable))
+
+    async def _renew_loop(self, ttl: int, renewable: bool) -> None:
+        """Renew token at ~2/3 of its TTL; fall back to a fresh AppRole login."""
+        while True:
+            await asyncio.sleep(max(ttl * 2 / 3, 1))
+            try:
+                if not renewable:
+                    raise hvac_exceptions.Forbidden("token is not renewable")
+                resp = await self._request("POST", "auth/token/renew-self", json={})
+                auth = resp.get("auth") or {}
+                ttl = auth.get("lease_duration") or ttl
+                renewable = bool(auth.get("renewable"))
+                log.info("vault_token_renewed", extra={"ttl": ttl})
+            except hvac_exceptions.VaultError:
+                if not (self._role_id and self._secret_id):
+                    log.exception("vault_token_renew_failed")
+                    continue
+                log.warning("vault_token_relogin")
+                await self.login()
+                return
 
-        if self._role_id and self._secret_id:
-            # hvac >= 0.11 supports this style
-            self._client.auth.approle.login(
-                role_id=self._role_id,
-                secret_id=self._secret_id,
+    # --- http -------------------------------------------------------------
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self._pool_limit, ssl=self._ssl),
+                timeout=self._timeout,
             )
-            if not self._client.is_authenticated():
-                raise RuntimeError("Vault AppRole login failed")
-            return
+        return self._session
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        *,
+        json: Optional[Dict[str, Any]] = None,
+        auth: bool = True,
+    ) -> Dict[str, Any]:
+        url = f"{self.addr}/v1/{path}"
+        headers = {}
+        if auth and self._client_token:
+            headers["X-Vault-Token"] = self._client_token
+        session = await self._get_session()
+        async with session.request(method, url, json=json, headers=headers) as resp:
+            if resp.status == 204:
+                return {}
+            try:
+                body = await resp.json(content_type=None)
+            except ValueError:
+                body = None
+            if resp.status >= 400:
+                errors = (body or {}).get("errors") if isinstance(body, dict) else None
+                raise_for_error(
+                    method,
+                    url,
+                    resp.status,
+                    message=", ".join(errors) if errors else None,
+                    errors=errors,
+                    json=body,
+                )
+            return body or {}
 
-        raise RuntimeError("Vault credentials missing (token or AppRole)")
+    async def _kv_request(
+        self, method: str, path: str, *, json: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """KV call that re-authenticates once if the token was revoked/expired."""
+        try:
+            return await self._request(method, path, json=json)
+        except hvac_exceptions.Forbidden:
+            if not (self._role_id and self._secret_id):
+                raise
+            await self.login()
+            return await self._request(method, path, json=json)
+
+    # --- KV v2 ------------------------------------------------------------
 
     def _fresh(self, key: str) -> Optional[Dict]:
         item = self._cache.get(key)
@@ -65,7 +181,7 @@ class VaultClient:
             return None
         return value
 
-    def read_kv(self, path: str) -> Dict:
+    async def read_kv(self, path: str) -> Dict:
         """
         Read KV v2 secret at `path` (relative to mount), with TTL cache.
         Returns the inner 'data' dict (not metadata).
@@ -74,33 +190,44 @@ class VaultClient:
         if cached is not None:
             return cached
 
-        resp = self._client.secrets.kv.v2.read_secret_version(
-            mount_point=self.mount,
-            path=path,
-        )
+        resp = await self._kv_request("GET", f"{self.mount}/data/{path}")
         data = resp["data"]["data"]
         self._cache[path] = (time.time(), data)
         return data
 
-    def write_kv(self, path: str, data: Dict) -> None:
+    async def read_kv_versioned(self, path: str) -> Tuple[Dict, int]:
+        """
+        Read KV v2 secret at `path` bypassing the cache.
+        Returns (data, version) where version is the KV v2 secret version.
+        """
+        resp = await self._kv_request("GET", f"{self.mount}/data/{path}")
+        payload = resp["data"]
+        return payload["data"], int((payload.get("metadata") or {}).get("version") or 0)
+
+    async def read_metadata(self, path: str) -> Dict:
+        """
+        Read KV v2 metadata at `path` (current_version, versions, ...).
+        Much cheaper than reading the secret itself; never cached.
+        """
+        resp = await self._kv_request("GET", f"{self.mount}/metadata/{path}")
+        return resp["data"]
+
+    async def write_kv(self, path: str, data: Dict) -> int:
         """
         Create/update KV v2 secret and refresh local cache.
+        Returns the new secret version.
         """
-        self._client.secrets.kv.v2.create_or_update_secret(
-            mount_point=self.mount,
-            path=path,
-            secret=data,
+        resp = await self._kv_request(
+            "POST", f"{self.mount}/data/{path}", json={"data": data}
         )
         self._cache[path] = (time.time(), data)
+        return int((resp.get("data") or {}).get("version") or 0)
 
-    def delete_kv(self, path: str) -> None:
+    async def delete_kv(self, path: str) -> None:
         """
         Delete KV v2 secret metadata and all versions; drop from cache.
         """
-        self._client.secrets.kv.v2.delete_metadata_and_all_versions(
-            mount_point=self.mount,
-            path=path,
-        )
+        await self._kv_request("DELETE", f"{self.mount}/metadata/{path}")
         self._cache.pop(path, None)
 
     def clear_cache(self, prefix: Optional[str] = None) -> None:
@@ -113,3 +240,13 @@ class VaultClient:
         for k in list(self._cache.keys()):
             if k.startswith(prefix):
                 del self._cache[k]
+
+    async def close(self) -> None:
+        """Stop token renewal and close pooled connections."""
+        if self._renew_task is not None:
+            self._renew_task.cancel()
+            with contextlib.suppress(BaseException):
+                await self._renew_task
+            self._renew_task = None
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+from typing import Dict, Optional, Set, Tuple
+
+from tgbot.common.logging_setup import log
+from tgbot.database.managers import TenantUserManager, UserManager
+from tgbot.database.models import TenantUser
+
+
+class WriteBehindBuffer:
+    """
+    Batches signup writes off the update hot path:
+    - tenant subscribers (insert or profile refresh) and main bot users
+      are collected in memory, deduplicated by key;
+    - flushed as multi-row upserts every `interval_seconds`, or sooner once
+      `max_batch` rows are pending;
+    - a failed flush re-queues its rows (newer values win); above
+      `max_pending` rows new ones are dropped and logged, add_*() then
+      return False so callers can write directly.
+    close() stops the loop and flushes what is left (call before close_db).
+    """
+
+    def __init__(
+        self,
+        interval_seconds: float = 0.2,
+        max_batch: int = 500,
+        max_pending: int = 50_000,
+    ) -> None:
+        self.configure(
+            interval_seconds=interval_seconds, max_batch=max_batch, max_pending=max_pending
+        )
+        # (tenant_id, tg_id) -> (full_name, username)
+        self._tenant_users: Dict[Tuple[int, int], Tuple[Optional[str], Optional[str]]] = {}
+        self._users: Set[int] = set()
+        self._task: Optional[asyncio.Task] = None
+        self._full: Optional[asyncio.Event] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self.flushed = 0
+        self.dropped = 0
+
+    def configure(
+        self, *, interval_seconds: float, max_batch: int, max_pending: int = 50_000
+    ) -> None:
+        self.interval_seconds = interval_seconds
+        self.max_batch = max_batch
+        self.max_pending = max_pending
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    @property
+    def pending(self) -> int:
+        return len(self._tenant_users) + len(self._users)
+
+    def add_tenant_user(
+        self,
+        tenant_id: int,
+        tg_id: int,
+        full_name: Optional[str],
+        username: Optional[str],
+    ) -> bool:
+        """Queue a subscriber upsert. Returns False if dropped (buffer full)."""
+        key = (tenant_id, tg_id)
+        if key not in self._tenant_users and not self._has_room():
+            return False
+        self._tenant_users[key] = (full_name, username)
+        self._wake_if_full()
+        return True
+
+    def add_user(self, tg_id: int) -> bool:
+        """Queue a main bot user insert. Returns False if dropped (buffer full)."""
+        if tg_id not in self._users and not self._has_room():
+            return False
+        self._users.add(tg_id)
+        self._wake_if_full()
+        return True
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._full = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(BaseException):
+                await self._task
+            self._task = None
+        await self.flush()
+
+    async def flush(self) -> int:
+        """Write all pending rows now. Returns the number of written rows."""
+        lock = self._lock or asyncio.Lock()
+        async with lock:
+            tenant_users, self._tenant_users = self._tenant_users, {}
+            users, self._users = self._users, set()
+            if not tenant_users and not users:
+                return 0
+            try:
+                await TenantUserManager.upsert_many(
+                    TenantUser(
+                        tenant_id=tenant_id,
+                        tg_id=tg_id,
+                        full_name=full_name,
+                        username=username,
+                    )
+                    for (tenant_id, tg_id), (full_name, username) in tenant_users.items()
+                )
+                await UserManager.create_many(users)
+            except Exception:
+                log.exception(
+                    "write_behind_flush_failed",
+                    extra={"tenant_users": len(tenant_users), "users": len(users)},
+                )
+                # keep newer values queued meanwhile
+                for key, profile in tenant_users.items():
+                    self._tenant_users.setdefault(key, profile)
+                self._users |= users
+                return 0
+            written = len(tenant_users) + len(users)
+            self.flushed += written
+            return written
+
+    def stats(self) -> Dict[str, int]:
+        return {"pending": self.pending, "flushed": self.flushed, "dropped": self.dropped}
+
+    def _has_room(self) -> bool:
+        if self.pending < self.max_pending:
+            return True
+        self.dropped += 1
+        if self.dropped % 1000 == 1:
+            log.warning("write_behind_overflow", extra={"dropped": self.dropped})
+        return False
+
+    def _wake_if_full(self) -> None:
+        if self._full is not None and self.pending >= self.max_batch:
+            self._full.set()
+
+    async def _run(self) -> None:
+        while True:
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._full.wait(), self.interval_seconds)
+            self._full.clear()
+            await self.flush()
+
+
+# Started in bot.py on_startup, flushed by close() on cleanup
+write_behind = WriteBehindBuffer()
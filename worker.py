@@ -0,0 +1,68 @@
+import asyncio
+import contextlib
+import signal
+
+from aiogram.client.default import DefaultBotProperties
+from aiogram.enums import ParseMode
+
+from tgbot.bootstrap import load_settings
+from tgbot.common.logging_setup import log
+from tgbot.database import close_db, start_db
+from tgbot.services.broadcast import broadcast_engine
+from tgbot.services.telegram_session import create_telegram_session
+
+
+async def main():
+    """
+    Broadcast worker: drains the `tenant_broadcast` job queue filled by the
+    webhook server (bot.py), so mailings never share its event loop.
+    """
+    app, secrets, vault, tenant_service = await load_settings()
+    if not secrets.db_dsn:
+        raise RuntimeError("db_dsn is required for the broadcast worker")
+    await start_db(secrets.db_dsn)
+
+    broadcast_engine.configure(
+        concurrency=app.broadcast_concurrency,
+        rate_per_second=app.broadcast_rate_per_second,
+        page_size=app.broadcast_page_size,
+        progress_interval_seconds=app.broadcast_progress_interval_seconds,
+        max_jobs=app.broadcast_max_jobs,
+        lease_seconds=app.broadcast_lease_seconds,
+        token_attempts=app.broadcast_token_attempts,
+        token_backoff_seconds=app.broadcast_token_backoff_seconds,
+    )
+
+    telegram_session = create_telegram_session(
+        limit=app.telegram_pool_limit,
+        limit_per_host=app.telegram_pool_limit_per_host,
+        keepalive_timeout=app.telegram_keepalive_seconds,
+        api_url=app.telegram_api_url,
+    )
+    serve_task = asyncio.create_task(
+        broadcast_engine.serve(
+            tenant_service,
+            bot_settings={"default": DefaultBotProperties(parse_mode=ParseMode.HTML)},
+            session=telegram_session,
+            poll_interval=app.broadcast_poll_interval_seconds,
+        )
+    )
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        with contextlib.suppress(NotImplementedError):
+            loop.add_signal_handler(sig, serve_task.cancel)
+
+    try:
+        await serve_task
+    except asyncio.CancelledError:
+        log.info("broadcast_worker_stopping")
+    finally:
+        await telegram_session.close()
+        await vault.close()
+        with contextlib.suppress(Exception):
+            await close_db()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())